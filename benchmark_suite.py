@@ -0,0 +1,296 @@
+"""
+Benchmark suite for the color hot paths.
+
+    python benchmark_suite.py                    # run, compare against this machine's baseline
+    python benchmark_suite.py --save-baseline    # run and store the results as this machine's baseline
+    python benchmark_suite.py -k cmyk -k wheel   # only benchmarks whose name contains one of the filters
+    python benchmark_suite.py --json out.json    # also write the raw results
+
+Exits with status 1 when a benchmark is significantly slower than the baseline by more than
+--threshold (default 20%), when a benchmark raises, or when `import utils` exceeds its import-time
+budget. Picker cases that can't run (no tkinter) are reported as SKIPPED.
+Baselines are stored per machine in benchmark_baselines/<machine>.json, since timings from
+different machines aren't comparable.
+"""
+import io
+import os
+import re
+import sys
+import json
+import argparse
+import platform
+import tempfile
+import subprocess
+import contextlib
+from pathlib import Path
+
+import utils
+from utils_extra_benchmark import benchmark, compare_results, save_results, load_results, format_result
+
+
+baseline_dir = Path(__file__).resolve().parent / "benchmark_baselines"
+
+# `import utils` must stay cheap: plain helpers only, heavy modules are loaded lazily on first use.
+import_time_budget = 0.100  # seconds
+import_forbidden_modules = ("PIL", "numpy", "colorama", "utils_extra_color_conversions")
+
+
+def machine_key() -> str:
+    raw = f"{platform.node()}-{platform.system()}-{platform.machine()}-py{platform.python_version()}"
+    return re.sub(r"[^A-Za-z0-9_.-]+", "_", raw).lower()
+
+
+def baseline_path() -> Path:
+    return baseline_dir / f"{machine_key()}.json"
+
+
+# ---------- Headless picker ----------
+
+class _HeadlessCanvas:
+    """Accepts the canvas calls the drawing methods make, without a display."""
+    def create_image(self, *args, **kwargs):
+        return 1
+
+    def create_oval(self, *args, **kwargs):
+        return 1
+
+    def delete(self, *args):
+        pass
+
+
+@contextlib.contextmanager
+def headless_picker(initial=(0, 255, 217, 210)):
+    """
+    Yield a PhotoshopColorPicker whose drawing methods run without Tk:
+    __init__ (window creation) is skipped, canvases are no-op stand-ins, PhotoImage returns the
+    PIL image, and the bold Arial font falls back to Pillow's default font where it isn't installed.
+    Runs in a temporary working directory because the first triangle draw writes debug_triangle.png.
+    """
+    import color_picker_redesign as picker_module
+    from PIL import ImageFont
+
+    picker = picker_module.PhotoshopColorPicker.__new__(picker_module.PhotoshopColorPicker)
+    r, g, b, a = initial
+    picker.initial_color = initial
+    picker.r, picker.g, picker.b, picker.alpha = r, g, b, a
+    picker.h, picker.s, picker.v = picker.rgb_to_hsv(r, g, b)
+    picker.selected_checkerboard_theme = "dark"
+    picker.initial_draw = True
+    picker.initial_wheel_image = None
+    picker.initial_triangle_image = None
+    picker.initial_checkerboard_image = None
+    picker.wheel_image = None
+    picker.preview_image = None
+    picker.triangle_points = []
+    picker.hue_marker = None
+    picker.sv_marker = None
+    picker.color_wheel_canvas = _HeadlessCanvas()
+    picker.preview_canvas = _HeadlessCanvas()
+
+    truetype = ImageFont.truetype
+
+    def truetype_or_default(font, size=10, *args, **kwargs):
+        try:
+            return truetype(font, size, *args, **kwargs)
+        except OSError:
+            return ImageFont.load_default(size)
+
+    photo_image = picker_module.ImageTk.PhotoImage
+    cwd = os.getcwd()
+    with tempfile.TemporaryDirectory() as tmp:
+        picker_module.ImageTk.PhotoImage = lambda img: img
+        ImageFont.truetype = truetype_or_default
+        os.chdir(tmp)
+        try:
+            yield picker
+        finally:
+            os.chdir(cwd)
+            ImageFont.truetype = truetype
+            picker_module.ImageTk.PhotoImage = photo_image
+
+
+def _initial_draw(picker, method, *args):
+    """Run a drawing method down its first-draw (full render) branch."""
+    def call():
+        picker.initial_draw = True
+        with contextlib.redirect_stdout(io.StringIO()):
+            method(*args)
+        picker.initial_draw = False
+    return call
+
+
+# ---------- Cases ----------
+
+# Names of the cases that need the headless picker (listed even when it can't be created, so they're reported as skipped)
+picker_case_names = (
+    "picker._draw_color_wheel.initial",
+    "picker._draw_color_wheel",
+    "picker._draw_sv_triangle.initial",
+    "picker._draw_checkerboard.initial",
+    "picker._draw_checkerboard",
+)
+
+def _cases(picker):
+    """(name, callable, benchmark options). Heavy cases use a fixed, small iteration count."""
+    from PIL import Image
+
+    utils.rgb_to_cmyk(0, 0, 0)  # loads the conversion module and default profiles
+    conv = sys.modules["utils_extra_color_conversions"]
+
+    def rgb_to_cmyk_uncached():
+        conv.conversion_cache.invalidate()
+        return utils.rgb_to_cmyk(12, 200, 99)
+
+    def cmyk_to_rgb_uncached():
+        conv.conversion_cache.invalidate()
+        return utils.cmyk_to_rgb(10, 20, 30, 40)
+
+    tri_img = Image.new("RGBA", (450, 450), (255, 0, 0, 255))
+    heavy = {"iterations": 5, "warmup": 1, "sample_time": 0, "track_memory": False}
+    medium = {"iterations": 30, "warmup": 2, "sample_time": 0}
+
+    cases = [
+        ("is_valid_color.hex", lambda: utils.is_valid_color("#FF8800"), {}),
+        ("is_valid_color.rgb_string", lambda: utils.is_valid_color("rgb(255, 136, 0)"), {}),
+        ("is_valid_color.tuple", lambda: utils.is_valid_color((255, 136, 0, 255), "rgba"), {}),
+        ("is_valid_color.invalid", lambda: utils.is_valid_color("not a color"), {}),
+        ("hex_to_rgb", lambda: utils.hex_to_rgb("#FF8800"), {}),
+        ("hsv_to_rgb", lambda: utils.hsv_to_rgb(200.0, 0.5, 0.75), {}),
+        ("rgb_to_cmyk.cached", lambda: utils.rgb_to_cmyk(12, 200, 99), {}),
+        ("rgb_to_cmyk.uncached", rgb_to_cmyk_uncached, {}),
+        ("cmyk_to_rgb.cached", lambda: utils.cmyk_to_rgb(10, 20, 30, 40), {}),
+        ("cmyk_to_rgb.uncached", cmyk_to_rgb_uncached, {}),
+        ("shift_image_hue_rgba.450x450", lambda: utils.shift_image_hue_rgba(tri_img, 100), medium),
+    ]
+    if picker is not None:
+        cases += [
+            ("picker._draw_color_wheel.initial", _initial_draw(picker, picker._draw_color_wheel), heavy),
+            ("picker._draw_color_wheel", picker._draw_color_wheel, medium),
+            ("picker._draw_sv_triangle.initial", _initial_draw(picker, picker._draw_sv_triangle, Image.new("RGB", (450, 450)), 225, 165), heavy),
+            ("picker._draw_checkerboard.initial", _initial_draw(picker, picker._draw_checkerboard), heavy),
+            ("picker._draw_checkerboard", picker._draw_checkerboard, medium),
+        ]
+    return cases
+
+
+def run_suite(filters=None, *, verbose: bool = True) -> dict:
+    """
+    Run every case whose name contains one of `filters` (all when empty).
+    Returns a dict:
+        - 'results': benchmark results of the cases that ran
+        - 'failed':  names of cases that raised
+        - 'skipped': names of picker cases that couldn't run (no tkinter / picker)
+    """
+    selected = lambda name: not filters or any(f in name for f in filters)
+    results, failed, skipped = [], [], []
+    with contextlib.ExitStack() as stack:
+        try:
+            picker = stack.enter_context(headless_picker())
+        except Exception as e:  # e.g. tkinter not available
+            picker = None
+            for name in picker_case_names:
+                if selected(name):
+                    print(f"{name:<36} SKIPPED: picker unavailable ({type(e).__name__}: {e})")
+                    skipped.append(name)
+        if picker is not None:
+            # Draw once so the incremental (non-initial) branches have their cached base images
+            _initial_draw(picker, picker._draw_color_wheel)()
+            _initial_draw(picker, picker._draw_checkerboard)()
+
+        for name, call, options in _cases(picker):
+            if not selected(name):
+                continue
+            try:
+                res = benchmark(call, name=name, **options)
+            except Exception as e:
+                print(f"{name:<36} FAILED: {type(e).__name__}: {e}")
+                failed.append(name)
+                continue
+            results.append(res)
+            if verbose:
+                print(format_result(res))
+    return {"results": results, "failed": failed, "skipped": skipped}
+
+
+def check_import_budget(budget: float = import_time_budget, runs: int = 5) -> dict:
+    """Time `import utils` in fresh interpreters (best of `runs`) and list any heavy modules it pulled in."""
+    code = (
+        "import sys, time, json\n"
+        "start = time.perf_counter()\n"
+        "import utils\n"
+        "elapsed = time.perf_counter() - start\n"
+        f"loaded = [m for m in {import_forbidden_modules!r} if m in sys.modules]\n"
+        "print(json.dumps([elapsed, loaded]))\n"
+    )
+    cwd = Path(__file__).resolve().parent
+    best, loaded = None, []
+    for _ in range(runs):
+        out = subprocess.run([sys.executable, "-c", code], cwd=cwd, capture_output=True, text=True, check=True)
+        elapsed, loaded = json.loads(out.stdout.strip().splitlines()[-1])
+        best = elapsed if best is None else min(best, elapsed)
+    return {"elapsed": best, "budget": budget, "loaded": loaded, "ok": best <= budget and not loaded}
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("-k", dest="filters", action="append", default=[], help="only run benchmarks whose name contains this")
+    parser.add_argument("--save-baseline", action="store_true", help="store the results as this machine's baseline")
+    parser.add_argument("--baseline", type=Path, default=None, help="baseline file (default: per-machine file in benchmark_baselines/)")
+    parser.add_argument("--threshold", type=float, default=0.20, help="allowed slowdown before failing (fraction, default 0.20)")
+    parser.add_argument("--json", type=Path, default=None, help="also write the results to this file")
+    parser.add_argument("--skip-import-check", action="store_true")
+    args = parser.parse_args(argv)
+
+    failed = False
+    if not args.skip_import_check:
+        imp = check_import_budget()
+        status = "ok" if imp["ok"] else "FAIL"
+        extra = f", loaded {', '.join(imp['loaded'])}" if imp["loaded"] else ""
+        print(f"import utils: {imp['elapsed'] * 1e3:.1f} ms (budget {imp['budget'] * 1e3:.0f} ms{extra}) {status}\n")
+        failed |= not imp["ok"]
+
+    run = run_suite(args.filters)
+    results = run["results"]
+    if run["failed"]:
+        print(f"\n{len(run['failed'])} benchmark(s) failed: {', '.join(run['failed'])}")
+        failed = True
+    if args.json:
+        save_results(results, args.json)
+
+    path = args.baseline or baseline_path()
+    if args.save_baseline:
+        if (args.filters or run["skipped"] or run["failed"]) and path.exists():
+            # merge a partial run into the existing baseline instead of dropping the other entries
+            previous = load_results(path).get("results", {})
+            merged = {**previous, **{r["name"]: r for r in results}}
+            results = list(merged.values())
+        save_results(results, path)
+        print(f"\nBaseline saved to {path}")
+        return 1 if failed else 0
+
+    if not path.exists():
+        print(f"\nNo baseline at {path}; run with --save-baseline to create one.")
+        return 1 if failed else 0
+
+    print(f"\nCompared to {path}:")
+    baseline = load_results(path).get("results", {})
+    for name in run["skipped"]:
+        if name in baseline:
+            print(f"{name:<36} SKIPPED (baseline exists, not compared)")
+    for name in run["failed"]:
+        if name in baseline:
+            print(f"{name:<36} FAILED (baseline exists, not compared)")
+    for res in results:
+        if res["name"] not in baseline:
+            print(f"{res['name']:<36} (no baseline)")
+            continue
+        cmp = compare_results(res, baseline[res["name"]], tolerance=args.threshold)
+        regressed = cmp["verdict"] == "slower"
+        failed |= regressed
+        p = f"{cmp['p_value']:.3g}" if cmp["p_value"] is not None else "-"
+        print(f"{res['name']:<36} {cmp['ratio']:6.2f}x  p={p:<9} {'REGRESSION' if regressed else cmp['verdict']}")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,6 +1,7 @@
 import tkinter as tk
 from tkinter import ttk
 import math
+import numpy as np
 import utils
 from PIL import Image, ImageDraw, ImageTk, ImageFont
 
@@ -403,6 +404,11 @@ class PhotoshopColorPicker(tk.Toplevel):
             # Draw color wheel (hue ring)
             img = Image.new('RGB', (size, size), "#4a4a4a00") #'#4a4a4a'
             draw = ImageDraw.Draw(img)
+            # All 360 hues in one vectorized call
+            hues = np.zeros((360, 3))
+            hues[:, 0] = np.arange(360)
+            hues[:, 1:] = 1.0
+            wheel_colors = utils.hsv_to_rgb_array(hues).tolist()
             for angle in range(360):
                 rad = math.radians(angle)
                 x1 = center + int(inner_radius * math.cos(rad))
@@ -410,7 +416,7 @@ class PhotoshopColorPicker(tk.Toplevel):
                 x2 = center + int(outer_radius * math.cos(rad))
                 y2 = center + int(outer_radius * math.sin(rad))
                 
-                r, g, b = self.hsv_to_rgb(angle, 1.0, 1.0)
+                r, g, b = wheel_colors[angle]
                 color = f'#{r:02x}{g:02x}{b:02x}'
                 
                 # Draw thick line for each degree
@@ -469,7 +475,6 @@ class PhotoshopColorPicker(tk.Toplevel):
 
         if self.initial_draw == True:
             tri_img = Image.new('RGBA', (450, 450), "#7c7c7c00") #'#4a4a4a'
-            tri_draw = ImageDraw.Draw(tri_img)
             # Create first triangle image
             
             # Fill triangle with gradient (simplified - just draw from corners)
@@ -482,34 +487,38 @@ class PhotoshopColorPicker(tk.Toplevel):
             # dot_size = 7
 
             steps = 255
-            dot_size = 1
             print(f"\n\n{self.h}\n\n")
-            for i in range(steps):
-                for j in range(steps - i):
-                    # Barycentric coordinates
-                    w = 1 - (i + j) / steps  # Weight for p0 (white)
-                    u = i / steps             # Weight for p1 (black)
-                    v = j / steps             # Weight for p2 (pure hue)
-                    
-                    if w < 0:
-                        continue
-                    
-                    # Map to S/V
-                    # sat = w / (w + v) if (w + v) > 0 else 0
-                    sat = w / (w + v) if (w + v) > 0 else 0
-                    val = w + v
-
-                    #r, g, b = self.hsv_to_rgb(self.h, sat, val)
-                    r, g, b = self.hsv_to_rgb(0.0, sat, val)
-                    #color = f'#{r:02x}{g:02x}{b:02x}'
-                    color = (r, g, b, 255)
-
-                    
-                    x = int(points[0][0] * w + points[1][0] * u + points[2][0] * v)
-                    y = int(points[0][1] * w + points[1][1] * u + points[2][1] * v)
-                    
-                    # 
-                    tri_draw.ellipse([(x-dot_size/2, y-dot_size/2), (x+dot_size/2, y+dot_size/2)], fill=color)
+            # Barycentric sample grid, in the same (i, j) order the per-dot loop used
+            i, j = np.meshgrid(np.arange(steps), np.arange(steps), indexing="ij")
+            inside = (i + j) < steps
+            i, j = i[inside], j[inside]
+            w = 1 - (i + j) / steps  # Weight for p0 (white)
+            u = i / steps             # Weight for p1 (black)
+            v = j / steps             # Weight for p2 (pure hue)
+
+            # Map to S/V, then to RGB in one call
+            val = w + v
+            sat = np.where(val > 0, w / np.where(val > 0, val, 1), 0.0)
+            colors = utils.hsv_to_rgb_array(np.stack([np.zeros_like(sat), sat, val], axis=-1))
+
+            x = (points[0][0] * w + points[1][0] * u + points[2][0] * v).astype(np.intp)
+            y = (points[0][1] * w + points[1][1] * u + points[2][1] * v).astype(np.intp)
+
+            # Each dot (a 1px ellipse) covers the 2x2 block (x-1..x, y-1..y); later dots overwrite earlier ones
+            xs = np.concatenate([x - 1, x, x - 1, x])
+            ys = np.concatenate([y - 1, y - 1, y, y])
+            order = np.tile(np.arange(len(x)), 4)
+            on_canvas = (xs >= 0) & (xs < 450) & (ys >= 0) & (ys < 450)
+            flat = (ys * 450 + xs)[on_canvas]
+            order = order[on_canvas]
+            # keep the last dot written to each pixel
+            by_pixel = np.lexsort((order, flat))
+            last = np.append(flat[by_pixel][1:] != flat[by_pixel][:-1], True)
+            pixels = np.array(tri_img)
+            rgba = pixels.reshape(-1, 4)
+            rgba[flat[by_pixel][last], :3] = colors[order[by_pixel][last]]
+            rgba[flat[by_pixel][last], 3] = 255
+            tri_img = Image.fromarray(pixels, "RGBA")
 
             tri_img.save("debug_triangle.png")
 
@@ -1164,47 +1173,12 @@ class PhotoshopColorPicker(tk.Toplevel):
     
     # Color conversion methods
     def hsv_to_rgb(self, h, s, v):
-        """Convert HSV to RGB"""
-        h = h % 360
-        c = v * s
-        x = c * (1 - abs((h / 60) % 2 - 1))
-        m = v - c
-        
-        if h < 60:
-            r, g, b = c, x, 0
-        elif h < 120:
-            r, g, b = x, c, 0
-        elif h < 180:
-            r, g, b = 0, c, x
-        elif h < 240:
-            r, g, b = 0, x, c
-        elif h < 300:
-            r, g, b = x, 0, c
-        else:
-            r, g, b = c, 0, x
-        
-        return int((r + m) * 255), int((g + m) * 255), int((b + m) * 255)
+        """Convert HSV to RGB (same as utils.hsv_to_rgb)"""
+        return utils.hsv_to_rgb(h, s, v)
     
     def rgb_to_hsv(self, r, g, b):
-        """Convert RGB to HSV"""
-        r, g, b = r / 255, g / 255, b / 255
-        max_c = max(r, g, b)
-        min_c = min(r, g, b)
-        diff = max_c - min_c
-        
-        if diff == 0:
-            h = 0
-        elif max_c == r:
-            h = (60 * ((g - b) / diff) + 360) % 360
-        elif max_c == g:
-            h = (60 * ((b - r) / diff) + 120) % 360
-        else:
-            h = (60 * ((r - g) / diff) + 240) % 360
-        
-        s = 0 if max_c == 0 else diff / max_c
-        v = max_c
-        
-        return h, s, v
+        """Convert RGB to HSV (same as utils.rgb_to_hsv)"""
+        return utils.rgb_to_hsv(r, g, b)
     
     def rgb_to_cmyk(self, r, g, b):  #self.rgb_to_cmyk   #self.rgb_to_cmyk
         """PLACEBO!!! USE 'utils.rgb_to_cmyk' FOR ACCURATE Convert RGB to CMYK"""
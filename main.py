@@ -10,6 +10,13 @@ class ButtonGeneratorApp:
         self.root.title("Dynamic Button Generator")
         self.root.geometry("500x600")
         
+        # Build the ICC transforms in the background so the first picker opens without a stall
+        # (utils has already printed a warning if the color conversion module failed to import)
+        try:
+            utils.start_color_warmup()
+        except AttributeError:
+            pass
+
         # Set theme and color
         ctk.set_appearance_mode("dark")
         ctk.set_default_color_theme("blue")
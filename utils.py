@@ -7,11 +7,10 @@ import time
 import os
 import sys
 import stat
-import inspect
-import importlib
-import traceback
 import types
-from colorama import Fore, Back, Style
+# colorama, inspect, importlib, traceback and the ICC color functions (PIL/NumPy)
+# are imported lazily, so `import utils` stays cheap for scripts that only need
+# the plain helpers. See __getattr__ below.
 
 debugWatermark = " #!#!#!# "
 
@@ -29,6 +28,8 @@ def try_import(module_name: str, mute_success = True, mute_errors = False):
         if try_import("utils"):
             import utils
     """
+    import importlib
+    from colorama import Fore, Style
     try:
         importlib.import_module(module_name)
         if not mute_success: print(f"{Fore.GREEN}Successfully imported '{module_name}'{Style.RESET_ALL}")
@@ -46,6 +47,7 @@ def try_import(module_name: str, mute_success = True, mute_errors = False):
 
     except Exception as e:
         if not mute_errors:
+            import traceback
             print(f"{Fore.RED}Module '{module_name}' failed to import due to an unexpected error:")
             traceback.print_exception(type(e), e, e.__traceback__)
             print(Style.RESET_ALL)
@@ -64,11 +66,53 @@ def is_module_imported(name):
         return None
     
 
-if try_import("utils_extra_color_conversions"):
-    from utils_extra_color_conversions import rgb_to_cmyk, cmyk_to_rgb, shift_image_hue_rgba, local_cmyk_to_rgb
-    #from utils_extra_color_conversions import selected_cmyk_profile, selected_rgb_profile, default_rgb_profile, default_cmyk_profile, cached_icc
-else:
-    print(f"{Fore.RED}Advanced color conversion functions will not work until error is correct!{Style.RESET_ALL}")
+# Names served lazily by __getattr__: module they live in -> names
+_LAZY_ATTRIBUTES = {
+    "colorama": ("Fore", "Back", "Style"),
+    "utils_extra_color_conversions": (
+        "rgb_to_cmyk", "cmyk_to_rgb", "shift_image_hue_rgba", "local_cmyk_to_rgb",
+        "rgb_to_cmyk_batch", "cmyk_to_rgb_batch", "conversion_cache", "set_selected_profiles", "ColorConverter",
+        "gamut_delta_e", "out_of_gamut_mask", "is_out_of_gamut", "gamut_mask_image", "compare_cmyk_profiles",
+        "start_color_warmup",
+        "parse_colors", "iter_parse_colors",
+        #"selected_cmyk_profile", "selected_rgb_profile", "default_rgb_profile", "default_cmyk_profile", "cached_icc",
+    ),
+    "utils_extra_color_arrays": (
+        "PaletteArray", "hsv_to_rgb_array", "rgb_to_hsv_array",
+    ),
+    "utils_extra_color_palettes": (
+        "convert_palette", "read_palette", "PaletteWriter",
+    ),
+    "utils_extra_instrumentation": (
+        "instrumentation",
+    ),
+    "utils_extra_benchmark": (
+        "benchmark", "compare_functions", "compare_results", "compare_to_baseline", "save_results", "load_results",
+    ),
+}
+_LAZY_SOURCES = {name: module for module, names in _LAZY_ATTRIBUTES.items() for name in names}
+
+def __getattr__(name):
+    """Import the module behind a lazy attribute on first access, then cache the attribute on utils."""
+    module_name = _LAZY_SOURCES.get(name)
+    if module_name is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    if module_name not in sys.modules and not try_import(module_name):
+        if module_name == "utils_extra_color_conversions":
+            from colorama import Fore, Style
+            print(f"{Fore.RED}Advanced color conversion functions will not work until error is correct!{Style.RESET_ALL}")
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r} ({module_name!r} failed to import)")
+    value = getattr(sys.modules[module_name], name)
+    globals()[name] = value
+    return value
+
+def _lazy(name):
+    """Module-internal access to a lazy attribute (plain global lookups don't go through __getattr__)."""
+    value = globals().get(name)
+    return value if value is not None else __getattr__(name)
+
+def __dir__():
+    return sorted(set(globals()) | set(_LAZY_SOURCES))
 
 
 # perf_test_iterations = 25
@@ -294,6 +338,7 @@ def set_file_permissions(path: str, mode="777"):
 
 
 def get_required_arg_count(func):
+    import inspect
     sig = inspect.signature(func)
     return sum(
         1 for p in sig.parameters.values()
@@ -328,6 +373,7 @@ def normalize_number_format(s):
 
     s = s.strip()  # Remove surrounding whitespace
     if not s:
+        from colorama import Fore
         print(f"{Fore.RED}Empty string cannot be converted{Fore.RESET}")
         return 0.0
         #raise ValueError("Empty string cannot be converted")
@@ -343,6 +389,8 @@ def normalize_number_format(s):
 
 
 def print_caller_info(stacknum=1):
+    import inspect
+    from colorama import Fore
     # Get the current stack frame and move one level back to the caller
     stack = inspect.stack()
     if len(stack) >= 2:
@@ -377,6 +425,7 @@ def pretty_print_nested(obj, indent=0, beforelinestr="", afterlinestr=""):
     if indent == 0:
         print_caller_info(2)
 
+    from colorama import Fore
     spacing = visual_ljust(f"{Fore.LIGHTBLACK_EX}·{Fore.RESET} ", 2) * indent
 
     if isinstance(obj, dict):
@@ -403,6 +452,85 @@ def pretty_print_nested(obj, indent=0, beforelinestr="", afterlinestr=""):
         print(f"{spacing}{beforelinestr}{repr(obj)}{afterlinestr}")
 
 
+# Precompiled color patterns. Channel ranges are part of the patterns (0..255 with up to
+# 3 digits, alpha 0, 1 or a decimal below 1), so one fullmatch is the whole check.
+_HEX_PATTERN = r"#(?:[0-9a-fA-F]{3}|[0-9a-fA-F]{4}|[0-9a-fA-F]{6}|[0-9a-fA-F]{8})"
+_CHANNEL_PATTERN = r"\s*(?:[01]?\d?\d|2[0-4]\d|25[0-5])\s*"
+_RGB_PATTERN = r"rgb\(" + ",".join([_CHANNEL_PATTERN] * 3) + r"\)"
+_RGBA_PATTERN = r"rgba\(" + ",".join([_CHANNEL_PATTERN] * 3) + r",\s*(?:0|1|0?\.\d+)\s*\)"
+_COLOR_PATTERNS = {"hex": _HEX_PATTERN, "rgb": _RGB_PATTERN, "rgba": _RGBA_PATTERN}
+
+
+class _ColorSpec:
+    """A normalized `specific` argument: the accepted formats, their label for errors, and one compiled pattern."""
+    __slots__ = ("formats", "label", "pattern", "rgb", "rgba")
+
+    def __init__(self, formats):
+        if "nil" in formats:
+            formats = ["rgb", "rgba", "hex"]
+        formats = list(dict.fromkeys(formats))
+        self.formats = frozenset(formats)
+        self.label = "/".join(formats)
+        self.pattern = re.compile("|".join(f"(?:{_COLOR_PATTERNS[f]})" for f in formats))
+        self.rgb = "rgb" in self.formats
+        self.rgba = "rgba" in self.formats
+
+
+_color_specs = {}
+
+def _color_spec(specific) -> _ColorSpec:
+    """Normalize and memoize `specific` ("rgb", "rgb/hex", ["rgba", "hex"], "nil", ...)."""
+    if type(specific) is _ColorSpec:
+        return specific
+    key = tuple(specific) if type(specific) is list else specific
+    try:
+        return _color_specs[key]
+    except (KeyError, TypeError):
+        pass
+
+    if type(specific) is str:
+        names = specific.split("/")
+    elif type(specific) is list:
+        names = [v for v in specific if type(v) == str]
+    else:
+        names = []
+    formats = [v.lower() for v in names if v.lower() in ("rgb", "rgba", "hex", "nil")] or ["nil"]
+    spec = _ColorSpec(formats)
+    try:
+        if len(_color_specs) < 1024:
+            _color_specs[key] = spec
+    except TypeError:
+        pass
+    return spec
+
+_RGB_COLOR = _color_spec("rgb")
+_RGBA_COLOR = _color_spec("rgba")
+
+
+def _check_color(value, spec: _ColorSpec) -> bool:
+    if type(value) is str:
+        return spec.pattern.fullmatch(value) is not None
+    if type(value) is Color:
+        # validated on construction
+        # an opaque Color is also a valid rgba value (it unpacks to 4 values)
+        return (spec.rgb or spec.rgba) if value.a == 1.0 else spec.rgba
+    if isinstance(value, (tuple, list)):
+        n = len(value)
+        if n == 3 and spec.rgb:
+            r, g, b = value
+        elif n == 4 and spec.rgba:
+            r, g, b, a = value
+            if not (isinstance(a, (float, int)) and 0.0 <= a <= 1.0):
+                return False
+        else:
+            return False
+        return (isinstance(r, int) and isinstance(g, int) and isinstance(b, int)
+                and 0 <= r <= 255 and 0 <= g <= 255 and 0 <= b <= 255)
+    if isinstance(value, str):
+        return spec.pattern.fullmatch(value) is not None
+    return False
+
+
 def is_valid_color(value, specific="nil", raiseError=False):
     """Checks if a color value is valid in one or more specified formats.
 
@@ -420,107 +548,139 @@ def is_valid_color(value, specific="nil", raiseError=False):
     - RGBA strings: "rgba(r, g, b, a)"
     - Tuples/lists: (r, g, b) or (r, g, b, a)
 
+    `specific` is parsed once and memoized; the formats only accept their own shape
+    ("rgba" no longer lets 3-value colors through). To check many values at once use `validate_many`.
+
     Example:
     >>> is_valid_color((255, 255, 255), specific="rgb")
     True
     """
+    spec = _color_spec(specific)
+    if _check_color(value, spec):
+        return True
+    if raiseError is True:
+        raise ValueError(f"'{value}' is not a valid {spec.label} value!")
+    return False
 
-    # print(f"debug is_valid_color: value={value}, specific={specific}, raiseError={raiseError}")
-
-    if specific == None or (type(specific) != str and type(specific) != list):
-        specific = "nil"
-    elif type(specific) == list:
-        tempSpecific = []
-        for v in specific:
-            if type(v) == str:
-                if v.lower() in ("rgb", "rgba", "hex", "nil"):
-                    tempSpecific.append(v.lower())
-
-        if len(tempSpecific) == 0:
-            tempSpecific = ["nil"]
-
-        specific = tempSpecific
-
-    if type(specific) == str:
-        tempSpecific_1 = specific.split("/")
-        tempSpecific_2 = []
-        for v in tempSpecific_1:
-            if v.lower() in ("rgb", "rgba", "hex", "nil"):
-                tempSpecific_2.append(v.lower())
 
-        if len(tempSpecific_2) == 0:
-            tempSpecific_2.append("nil")
+def validate_many(values, specific="nil"):
+    """
+    Validate a whole column of colors at once. Returns a NumPy boolean mask, True where
+    `is_valid_color(value, specific)` would be True.
+    - values: a list/iterable of color strings or tuples, or an (N,3)/(N,4) numeric array
+      (integer arrays are range-checked in one vectorized pass; float channels are invalid, as for scalars)
+    """
+    import numpy as np
+
+    spec = _color_spec(specific)
+    if isinstance(values, np.ndarray) and values.dtype != object:
+        if values.ndim != 2 or values.shape[1] not in (3, 4):
+            return np.zeros(len(values) if values.ndim else 0, dtype=bool)
+        n, channels = values.shape
+        if (channels == 3 and not spec.rgb) or (channels == 4 and not spec.rgba):
+            return np.zeros(n, dtype=bool)
+        kind = values.dtype.kind
+        if kind not in "iub":
+            return np.zeros(n, dtype=bool)
+        mask = ((values[:, :3] >= 0) & (values[:, :3] <= 255)).all(axis=1)
+        if channels == 4:
+            mask &= (values[:, 3] >= 0) & (values[:, 3] <= 1)
+        return mask
+
+    values = values if isinstance(values, (list, tuple)) else list(values)
+    if all(type(v) is str for v in values):
+        fullmatch = spec.pattern.fullmatch
+        return np.fromiter((m is not None for m in map(fullmatch, values)), dtype=bool, count=len(values))
+    return np.fromiter((_check_color(v, spec) for v in values), dtype=bool, count=len(values))
+
+
+# One combined pattern for classify_color; which group matched last tells the format apart.
+_CHANNEL_GROUP = r"\s*([01]?\d?\d|2[0-4]\d|25[0-5])\s*"
+_PERCENT_GROUP = r"\s*(100(?:\.0*)?|\d{1,2}(?:\.\d+)?)%?\s*"
+_CLASSIFY_PATTERN = re.compile(
+    r"#([0-9a-fA-F]{3}|[0-9a-fA-F]{4}|[0-9a-fA-F]{6}|[0-9a-fA-F]{8})"  # group 1
+    r"|rgb\(" + ",".join([_CHANNEL_GROUP] * 3) + r"\)"  # groups 2-4
+    r"|rgba\(" + ",".join([_CHANNEL_GROUP] * 3) + r",\s*(0|1|0?\.\d+)\s*\)"  # groups 5-8
+    r"|cmyk\(" + ",".join([_PERCENT_GROUP] * 4) + r"\)"  # groups 9-12
+)
+
+
+def _hex_tuple(digits):
+    v = int(digits, 16)
+    length = len(digits)
+    if length == 6:
+        return v >> 16, (v >> 8) & 255, v & 255
+    if length == 8:
+        return v >> 24, (v >> 16) & 255, (v >> 8) & 255, round((v & 255) / 255, 4)
+    if length == 3:
+        return (v >> 8) * 17, ((v >> 4) & 15) * 17, (v & 15) * 17
+    return (v >> 12) * 17, ((v >> 8) & 15) * 17, ((v >> 4) & 15) * 17, round((v & 15) * 17 / 255, 4)
 
-        specific = tempSpecific_2
-    else:
-        specific = specific.lower()
 
-    if raiseError == None or type(raiseError) != bool:
-        raiseError = False
+def classify_color(value, raiseError=False):
+    """
+    Classify and parse a color in one pass.
 
-    checkedFormatsStr = ""
-    if "nil" in specific:
-        checkedFormatsStr = "rgb/rgba/hex"
-    else:
-        checkedFormatsStr = "/".join(specific).lower()
+    Returns:
+    - (type, values): type is "hex", "rgb", "rgba" or "cmyk" and values the normalized tuple:
+      hex -> (r, g, b) or (r, g, b, a) with a in 0..1 (same as hex_to_rgb), rgb()/rgba() strings and
+      tuples -> (r, g, b[, a]), "cmyk(c, m, y, k)" (0..100, "%" optional) -> (c, m, y, k) as numbers.
+    - (False, None) if the value isn't a supported color (or raises ValueError with raiseError=True).
 
+    Example:
+    >>> classify_color("#FF000080")
+    ('hex', (255, 0, 0, 0.502))
+    """
     if isinstance(value, str):
-        # HEX patterns
-        hex_pattern = (
-            r"^#(?:[0-9a-fA-F]{3}|[0-9a-fA-F]{4}|[0-9a-fA-F]{6}|[0-9a-fA-F]{8})$"
-        )
-        if re.fullmatch(hex_pattern, value) and "hex" in checkedFormatsStr:
-            return True
-
-        # rgb() and rgba() string patterns
-        rgb_pattern = r"^rgb\(\s*(\d{1,3})\s*,\s*(\d{1,3})\s*,\s*(\d{1,3})\s*\)$"
-        rgba_pattern = r"^rgba\(\s*(\d{1,3})\s*,\s*(\d{1,3})\s*,\s*(\d{1,3})\s*,\s*(0|1|0?\.\d+)\s*\)$"
+        m = _CLASSIFY_PATTERN.fullmatch(value)
+        if m is not None:
+            last = m.lastindex
+            groups = m.groups()
+            if last == 1:
+                return "hex", _hex_tuple(groups[0])
+            if last == 4:
+                return "rgb", (int(groups[1]), int(groups[2]), int(groups[3]))
+            if last == 8:
+                return "rgba", (int(groups[4]), int(groups[5]), int(groups[6]), float(groups[7]))
+            return "cmyk", tuple(float(v) if "." in v else int(v) for v in groups[8:12])
+    elif type(value) is Color:
+        return ("rgb", value.rgb) if value.a == 1.0 else ("rgba", value.rgba)
+    elif isinstance(value, (tuple, list)):
+        if len(value) == 3 and _check_color(value, _RGB_COLOR):
+            return "rgb", tuple(value)
+        if len(value) == 4 and _check_color(value, _RGBA_COLOR):
+            return "rgba", tuple(value)
+
+    if raiseError is True:
+        raise ValueError(f"'{value}' is not a valid color format!")
+    return False, None
 
-        if m := re.fullmatch(rgb_pattern, value) and "rgb" in checkedFormatsStr:
-            r, g, b = map(int, m.groups())
-            return all(0 <= x <= 255 for x in (r, g, b))
 
-        if m := re.fullmatch(rgba_pattern, value) and "rgba" in checkedFormatsStr:
-            r, g, b = map(int, m.groups()[:3])
-            a = float(m.group(4))
-            return all(0 <= x <= 255 for x in (r, g, b)) and 0.0 <= a <= 1.0
-
-    # RGB or RGBA tuple/list
-    if isinstance(value, (tuple, list)):
-        if len(value) == 3 and "rgb" in checkedFormatsStr:
-            return all(isinstance(x, int) and 0 <= x <= 255 for x in value)
-        elif len(value) == 4 and "rgba" in checkedFormatsStr:
-            r, g, b, a = value
-            return all(isinstance(x, int) and 0 <= x <= 255 for x in (r, g, b)) and (
-                isinstance(a, (float, int)) and 0.0 <= a <= 1.0
-            )
-
-    if raiseError:
-        raise ValueError(f"'{value}' is not a valid {checkedFormatsStr} value!")
-    return False
+def _require_color(value, types, label):
+    """classify_color restricted to `types`; raises the same error message as is_valid_color."""
+    color_type, values = classify_color(value)
+    if color_type not in types:
+        raise ValueError(f"'{value}' is not a valid {label} value!")
+    return color_type, values
 
 
 def get_color_type(value, raiseError=False):
-    # print(f"{debugWatermark}")
-    for v in ("rgb", "rgba", "hex"):
-        if is_valid_color(value, specific=v):
-            # print(f"ran code v={v}, returned val={is_valid_color(value, specific=v)}")
-            return v
-
-    # print(f"{debugWatermark}")
-    if raiseError:
+    """Return "rgb", "rgba", "hex" or "cmyk" for a supported color, else False (see `classify_color`)."""
+    color_type = classify_color(value)[0]
+    if not color_type and raiseError:
         raise ValueError(f"'{value}' is not a valid color format!")
-    return False
+    return color_type
 
 
 def rgb_to_hex(rgb):
+    if type(rgb) is Color:
+        return rgb.hex
     if len(rgb) == 4:
-        is_valid_color(rgb, specific="rgba", raiseError=True)
-        r, g, b, a = rgb
-        return f"#{r:02X}{g:02X}{b:02X}{(round(a * 255)):02X}".format(*rgb)
+        _, (r, g, b, a) = _require_color(rgb, ("rgba",), "rgba")
+        return f"#{r:02X}{g:02X}{b:02X}{(round(a * 255)):02X}"
     else:
-        is_valid_color(rgb, specific="rgb", raiseError=True)
-        return "#{:02X}{:02X}{:02X}".format(*rgb)
+        _, (r, g, b) = _require_color(rgb, ("rgb",), "rgb")
+        return f"#{r:02X}{g:02X}{b:02X}"
 
 
 def hex_to_rgb(hex_str, include_alpha=False):
@@ -533,28 +693,7 @@ def hex_to_rgb(hex_str, include_alpha=False):
             #RRGGBBAA
             #RGBA (if include_alpha=True)
     """
-    is_valid_color(hex_str, specific="hex", raiseError=True)
-
-    hex_str = hex_str.strip().lstrip("#")
-    length = len(hex_str)
-
-    # Expand short forms like #F00 → #FF0000
-    if length == 3:
-        r, g, b = [int(c * 2, 16) for c in hex_str]
-        return (r, g, b)
-    elif length == 4:# and include_alpha:
-        r, g, b, a = [int(c * 2, 16) for c in hex_str]
-        a = round(a / 255, 4)
-        return (r, g, b, a)
-    elif length == 6:
-        r, g, b = [int(hex_str[i : i + 2], 16) for i in (0, 2, 4)]
-        return (r, g, b)
-    elif length == 8:# and include_alpha:
-        r, g, b, a = [int(hex_str[i : i + 2], 16) for i in (0, 2, 4, 6)]
-        a = round(a / 255, 4)
-        return (r, g, b, a)
-    else:
-        raise ValueError(f"Invalid hex color format: {hex_str}")
+    return _require_color(hex_str, ("hex",), "hex")[1]
     
 
 def hex_to_decimal(hex_str, include_alpha=False):
@@ -567,7 +706,6 @@ def hex_to_decimal(hex_str, include_alpha=False):
             #RRGGBBAA
             #RGBA (if include_alpha=True)
     """
-    is_valid_color(hex_str, specific="hex", raiseError=True)
     return tuple(round(c / 255, 4) for c in hex_to_rgb(hex_str=hex_str, include_alpha=include_alpha))
 
 
@@ -610,7 +748,7 @@ def decimal_to_hex(decimal_rgb):
     return rgb_to_hex(decimal_to_rgb(decimal_rgb=decimal_rgb))
 
 def hsv_to_rgb(h, s, v):
-    """Convert HSV to RGB"""
+    """Convert HSV to RGB (for many colors at once use hsv_to_rgb_array)"""
     h = h % 360
     c = v * s
     x = c * (1 - abs((h / 60) % 2 - 1))
@@ -632,7 +770,7 @@ def hsv_to_rgb(h, s, v):
     return int((r + m) * 255), int((g + m) * 255), int((b + m) * 255)
 
 def rgb_to_hsv(r, g, b):
-    """Convert RGB to HSV"""
+    """Convert RGB to HSV (for many colors at once use rgb_to_hsv_array)"""
     r, g, b = r / 255, g / 255, b / 255
     max_c = max(r, g, b)
     min_c = min(r, g, b)
@@ -697,12 +835,8 @@ def blend_colors(fg, bg, alpha):
     - This uses linear interpolation: blended = alpha * fg + (1 - alpha) * bg
     - Color values are rounded to the nearest integer.
     """
-    is_valid_color(fg, specific="rgb/hex", raiseError=True)
-    is_valid_color(bg, specific="rgb/hex", raiseError=True)
-    if get_color_type(fg) == "hex":
-        fg = hex_to_rgb(fg)
-    if get_color_type(bg) == "hex":
-        bg = hex_to_rgb(bg)
+    fg = _require_color(fg, ("rgb", "hex"), "rgb/hex")[1]
+    bg = _require_color(bg, ("rgb", "hex"), "rgb/hex")[1]
 
 
     return tuple(round(alpha * fg[i] + (1 - alpha) * bg[i]) for i in range(3))
@@ -724,13 +858,12 @@ def adjust_color_for_contrast(fg, bg=None, adjust=-30):
             (R, G, B) tuple
     """
 
-    is_valid_color(fg, specific="rgb/hex", raiseError=True)
+    fg = _require_color(fg, ("rgb", "hex"), "rgb/hex")[1][:3]
+    if bg is not None:
+        bg = _require_color(bg, ("rgb", "hex"), "rgb/hex")[1][:3]
     # print(fg)
     # print(bg)
 
-    if is_valid_color(fg, specific="hex"):
-        fg = hex_to_rgb(fg)
-
     # print(f"new fg={fg}")
     # print(f"new bg={bg}")
 
@@ -763,6 +896,131 @@ def get_contrast_color(bg):
     return (0, 0, 0) if brightness > 186 else (255, 255, 255)
 
 
+class Color:
+    """
+    Immutable color value: canonical 8-bit RGB plus alpha (0..1), with derived forms
+    (hex, HSV, decimal, ICC CMYK) computed on first access and cached on the instance.
+
+    Colors are hashable and compare by RGBA, so they can key dicts and the conversion caches.
+    `is_valid_color`/`classify_color` trust Color instances without re-checking them.
+
+    Example:
+    >>> c = Color.parse("#FF8800")
+    >>> c.hsv, c.hex
+    ((32.0, 1.0, 1.0), '#FF8800')
+    """
+    __slots__ = ("r", "g", "b", "a", "_hex", "_hsv", "_decimal", "_cmyk")
+
+    def __init__(self, r, g, b, a=1.0):
+        if not _check_color((r, g, b, a), _RGBA_COLOR):
+            raise ValueError(f"'{(r, g, b, a)}' is not a valid rgba value!")
+        # derived-form slots stay unset until first access
+        set_slot = object.__setattr__
+        set_slot(self, "r", r)
+        set_slot(self, "g", g)
+        set_slot(self, "b", b)
+        set_slot(self, "a", float(a))
+
+    @classmethod
+    def parse(cls, value):
+        """Build a Color from anything `classify_color` accepts (cmyk() strings go through the ICC profiles)."""
+        if type(value) is cls:
+            return value
+        color_type, values = classify_color(value, raiseError=True)
+        if color_type == "cmyk":
+            return cls.from_cmyk(*values)
+        return cls(*values)
+
+    @classmethod
+    def from_hsv(cls, h, s, v, a=1.0):
+        return cls(*hsv_to_rgb(h, s, v), a)
+
+    @classmethod
+    def from_cmyk(cls, c, m, y, k, a=1.0, **profile_kwargs):
+        """CMYK percentages (0..100) through the ICC profiles (see `cmyk_to_rgb` for the keyword arguments)."""
+        return cls(*_lazy("cmyk_to_rgb")(c, m, y, k, **profile_kwargs), a)
+
+    def __setattr__(self, name, value):
+        raise AttributeError(f"{type(self).__name__} is immutable")
+
+    def __delattr__(self, name):
+        raise AttributeError(f"{type(self).__name__} is immutable")
+
+    def __reduce__(self):
+        return type(self), (self.r, self.g, self.b, self.a)
+
+    def __eq__(self, other):
+        if type(other) is not Color:
+            return NotImplemented
+        return self.r == other.r and self.g == other.g and self.b == other.b and self.a == other.a
+
+    def __hash__(self):
+        return hash((self.r, self.g, self.b, self.a))
+
+    def __iter__(self):
+        return iter((self.r, self.g, self.b, self.a))
+
+    def __repr__(self):
+        return f"Color({self.r}, {self.g}, {self.b}, {self.a:g})"
+
+    @property
+    def rgb(self):
+        return self.r, self.g, self.b
+
+    @property
+    def rgba(self):
+        return self.r, self.g, self.b, self.a
+
+    @property
+    def hex(self):
+        """"#RRGGBB", or "#RRGGBBAA" when not fully opaque."""
+        try:
+            return self._hex
+        except AttributeError:
+            value = rgb_to_hex(self.rgb if self.a == 1.0 else self.rgba)
+            object.__setattr__(self, "_hex", value)
+            return value
+
+    @property
+    def hsv(self):
+        """(h 0..360, s 0..1, v 0..1)"""
+        try:
+            return self._hsv
+        except AttributeError:
+            value = rgb_to_hsv(self.r, self.g, self.b)
+            object.__setattr__(self, "_hsv", value)
+            return value
+
+    @property
+    def decimal(self):
+        """(r, g, b) in 0..1"""
+        try:
+            return self._decimal
+        except AttributeError:
+            value = rgb_to_decimal(self.rgb)
+            object.__setattr__(self, "_decimal", value)
+            return value
+
+    @property
+    def cmyk(self):
+        """ICC CMYK percentages through the selected profiles (recomputed if the selection changes)."""
+        convert = _lazy("rgb_to_cmyk")
+        conversions = sys.modules["utils_extra_color_conversions"]
+        profiles = (conversions.selected_cmyk_profile, conversions.selected_rgb_profile)
+        cached = getattr(self, "_cmyk", None)
+        if cached is None or cached[0] != profiles:
+            cached = (profiles, convert(self.r, self.g, self.b))
+            object.__setattr__(self, "_cmyk", cached)
+        return cached[1]
+
+    def to_cmyk(self, **profile_kwargs):
+        """ICC CMYK percentages with explicit profiles/intent (see `rgb_to_cmyk`); uses the shared conversion cache."""
+        return _lazy("rgb_to_cmyk")(self.r, self.g, self.b, **profile_kwargs)
+
+    def with_alpha(self, a):
+        return Color(self.r, self.g, self.b, a)
+
+
 def convertNumToLetter(num):
     letterList = [
         "A",
@@ -827,6 +1085,8 @@ def visual_ljust(s, width, fillchar=" "):
 def measure_performance(func, *args, iterations=1, **kwargs):
     """
     Measures the execution time of a function.
+    For warm-up, auto-calibrated iterations, allocation tracking, JSON baselines and
+    significance testing use `utils.benchmark` / `utils.compare_functions` (utils_extra_benchmark).
     
     Args:
         func: The function to measure
@@ -841,6 +1101,7 @@ def measure_performance(func, *args, iterations=1, **kwargs):
             - 'avg_time': Average execution time per iteration in seconds
             - 'min_time': Minimum execution time in seconds
             - 'max_time': Maximum execution time in seconds
+            - 'p50', 'p95', 'p99': Percentiles of the per-iteration times in seconds
             - 'iterations': Number of iterations performed
     
     Usage:
@@ -860,13 +1121,20 @@ def measure_performance(func, *args, iterations=1, **kwargs):
         end_time = time.perf_counter()
         times.append(end_time - start_time)
     
+    from utils_extra_instrumentation import nearest_rank_percentile
+
     total_time = sum(times)
+    ordered = sorted(times)
+    percentile = lambda p: nearest_rank_percentile(ordered, p)
     
     return {
         'result': result,
         'total_time': total_time,
         'avg_time': total_time / iterations,
-        'min_time': min(times),
-        'max_time': max(times),
+        'min_time': ordered[0],
+        'max_time': ordered[-1],
+        'p50': percentile(50),
+        'p95': percentile(95),
+        'p99': percentile(99),
         'iterations': iterations
     }
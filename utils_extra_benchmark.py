@@ -0,0 +1,264 @@
+import gc
+import json
+import math
+import time
+import platform
+import statistics
+import tracemalloc
+from pathlib import Path
+
+from utils_extra_instrumentation import nearest_rank_percentile
+
+
+# ---------- Benchmark harness ----------
+
+def _calibrate(call, target: float) -> int:
+    """Number of calls per sample so one sample takes about `target` seconds (timer resolution safety)."""
+    number = 1
+    while True:
+        start = time.perf_counter()
+        for _ in range(number):
+            call()
+        elapsed = time.perf_counter() - start
+        if elapsed >= target or number >= 1 << 20:
+            return number
+        # grow towards the target, at most 10x per step
+        number = max(number + 1, min(number * 10, int(number * target / max(elapsed, 1e-9))))
+
+
+def benchmark(
+    func,
+    args: tuple = (),
+    kwargs: dict | None = None,
+    *,
+    name: str | None = None,
+    warmup: int | float = 0.05,
+    iterations: int | None = None,
+    min_time: float = 0.2,
+    max_iterations: int = 10_000,
+    sample_time: float = 0.0005,
+    disable_gc: bool = True,
+    track_memory: bool = True,
+    keep_samples: bool = True,
+) -> dict:
+    """
+    Benchmark `func(*args, **kwargs)` and return a results dictionary.
+    - warmup: an int runs that many untimed calls, a float runs untimed calls for that many seconds
+    - iterations: number of timed samples; None auto-calibrates to fill `min_time` seconds
+      (capped at `max_iterations`)
+    - sample_time: very fast functions are called several times per sample so each sample lasts
+      at least this long; per-call times are reported
+    - disable_gc: collect first, then keep the garbage collector off while timing
+    - track_memory: one extra call under tracemalloc (kept out of the timed samples, since
+      tracing slows everything down) reporting peak and retained bytes
+
+    Returns:
+        A dictionary containing 'name', 'result', 'iterations', 'number' (calls per sample),
+        'total_time', 'avg_time', 'min_time', 'max_time', 'stdev', 'p50', 'p95', 'p99',
+        'samples' (per-call seconds), 'mem_peak' and 'mem_retained' (bytes, or None).
+
+    Usage:
+        res = benchmark(utils.hex_to_rgb, ("#ff8800",))
+        print(f"p50 {res['p50'] * 1e6:.2f}µs  p99 {res['p99'] * 1e6:.2f}µs")
+    """
+    kwargs = kwargs or {}
+    call = lambda: func(*args, **kwargs)
+
+    # 1) Warm-up (caches, lazy imports, ICC transforms, ...)
+    result = call()
+    if isinstance(warmup, float):
+        deadline = time.perf_counter() + warmup
+        while time.perf_counter() < deadline:
+            call()
+    else:
+        for _ in range(warmup):
+            call()
+
+    # 2) Calibrate calls per sample and number of samples
+    number = _calibrate(call, sample_time) if sample_time else 1
+    if iterations is None:
+        start = time.perf_counter()
+        for _ in range(number):
+            call()
+        per_sample = max(time.perf_counter() - start, 1e-9)
+        iterations = int(min(max_iterations, max(5, min_time / per_sample)))
+
+    # 3) Timed samples
+    gc_was_enabled = gc.isenabled()
+    if disable_gc:
+        gc.collect()
+        gc.disable()
+    samples = []
+    perf_counter = time.perf_counter
+    try:
+        for _ in range(iterations):
+            start = perf_counter()
+            for _ in range(number):
+                call()
+            samples.append((perf_counter() - start) / number)
+    finally:
+        if disable_gc and gc_was_enabled:
+            gc.enable()
+
+    # 4) Allocations, measured separately from timing
+    mem_peak = mem_retained = None
+    if track_memory:
+        already_tracing = tracemalloc.is_tracing()
+        if not already_tracing:
+            tracemalloc.start()
+        try:
+            tracemalloc.reset_peak()
+            before, _ = tracemalloc.get_traced_memory()
+            call()
+            after, peak = tracemalloc.get_traced_memory()
+            mem_peak, mem_retained = peak - before, after - before
+        finally:
+            if not already_tracing:
+                tracemalloc.stop()
+
+    ordered = sorted(samples)
+    total = sum(samples)
+    return {
+        "name": name or getattr(func, "__qualname__", repr(func)),
+        "result": result,
+        "iterations": iterations,
+        "number": number,
+        "total_time": total,
+        "avg_time": total / iterations,
+        "min_time": ordered[0],
+        "max_time": ordered[-1],
+        "stdev": statistics.stdev(samples) if iterations > 1 else 0.0,
+        "p50": nearest_rank_percentile(ordered, 50),
+        "p95": nearest_rank_percentile(ordered, 95),
+        "p99": nearest_rank_percentile(ordered, 99),
+        "samples": samples if keep_samples else None,
+        "mem_peak": mem_peak,
+        "mem_retained": mem_retained,
+    }
+
+
+# ---------- Significance test ----------
+
+def mann_whitney_u(a, b) -> tuple:
+    """
+    Two-sided Mann-Whitney U test (normal approximation with tie correction).
+    Returns (U, p_value). Makes no normality assumption, which suits skewed latency samples.
+    """
+    n1, n2 = len(a), len(b)
+    if n1 == 0 or n2 == 0:
+        return 0.0, 1.0
+    combined = sorted([(v, 0) for v in a] + [(v, 1) for v in b])
+    ranks = [0.0] * len(combined)
+    tie_term = 0
+    i = 0
+    while i < len(combined):
+        j = i
+        while j + 1 < len(combined) and combined[j + 1][0] == combined[i][0]:
+            j += 1
+        avg_rank = (i + j) / 2 + 1
+        for t in range(i, j + 1):
+            ranks[t] = avg_rank
+        size = j - i + 1
+        tie_term += size ** 3 - size
+        i = j + 1
+    r1 = sum(rank for rank, (_, group) in zip(ranks, combined) if group == 0)
+    u1 = r1 - n1 * (n1 + 1) / 2
+    n = n1 + n2
+    mean = n1 * n2 / 2
+    var = n1 * n2 / 12 * ((n + 1) - tie_term / (n * (n - 1))) if n > 1 else 0
+    if var <= 0:
+        return u1, 1.0
+    z = (abs(u1 - mean) - 0.5) / math.sqrt(var)  # continuity correction
+    p = math.erfc(max(z, 0) / math.sqrt(2))
+    return u1, min(1.0, p)
+
+
+def compare_results(current: dict, baseline: dict, *, alpha: float = 0.05, tolerance: float = 0.05) -> dict:
+    """
+    Compare two benchmark results of the same function.
+    - Significance comes from a Mann-Whitney U test on the per-call samples.
+    - A change is only reported as "faster"/"slower" when it is significant AND the median moved by
+      more than `tolerance` (fraction), so noise on a quiet machine doesn't flag tiny shifts.
+    Returns a dict with both medians, 'ratio' (current / baseline p50), 'p_value' and 'verdict'.
+    """
+    ratio = current["p50"] / baseline["p50"] if baseline["p50"] else math.inf
+    a, b = current.get("samples"), baseline.get("samples")
+    p_value = mann_whitney_u(a, b)[1] if a and b else None
+    significant = p_value is not None and p_value < alpha
+    if significant and ratio > 1 + tolerance:
+        verdict = "slower"
+    elif significant and ratio < 1 - tolerance:
+        verdict = "faster"
+    else:
+        verdict = "same"
+    return {
+        "name": current.get("name"),
+        "baseline_p50": baseline["p50"],
+        "current_p50": current["p50"],
+        "ratio": ratio,
+        "p_value": p_value,
+        "significant": significant,
+        "verdict": verdict,
+    }
+
+
+def compare_functions(func_a, func_b, args: tuple = (), kwargs: dict | None = None, **options) -> dict:
+    """
+    Benchmark two implementations of the same function on the same inputs.
+    `verdict` describes func_b relative to func_a ("faster" means func_b is faster).
+    """
+    res_a = benchmark(func_a, args, kwargs, **options)
+    res_b = benchmark(func_b, args, kwargs, **options)
+    return {"a": res_a, "b": res_b, "comparison": compare_results(res_b, res_a)}
+
+
+# ---------- JSON results / baselines ----------
+
+def machine_info() -> dict:
+    return {
+        "machine": platform.machine(),
+        "processor": platform.processor(),
+        "node": platform.node(),
+        "system": platform.system(),
+        "python": platform.python_version(),
+        "implementation": platform.python_implementation(),
+    }
+
+
+def save_results(results, path: str | Path, *, extra: dict | None = None):
+    """Write one result or a list of results as JSON (return values are dropped; samples are kept)."""
+    results = [results] if isinstance(results, dict) else list(results)
+    payload = {
+        "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "machine": machine_info(),
+        **(extra or {}),
+        "results": {r["name"]: {k: v for k, v in r.items() if k != "result"} for r in results},
+    }
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_suffix(path.suffix + ".tmp")
+    tmp.write_text(json.dumps(payload, indent=2))
+    tmp.replace(path)
+
+
+def load_results(path: str | Path) -> dict:
+    """Load a file written by `save_results`. Returns {} if it doesn't exist."""
+    try:
+        return json.loads(Path(path).read_text())
+    except FileNotFoundError:
+        return {}
+
+
+def compare_to_baseline(results, baseline_path: str | Path, **options) -> list:
+    """Compare results against the matching entries of a stored baseline file (entries without a baseline are skipped)."""
+    results = [results] if isinstance(results, dict) else list(results)
+    baseline = load_results(baseline_path).get("results", {})
+    return [compare_results(r, baseline[r["name"]], **options) for r in results if r["name"] in baseline]
+
+
+def format_result(res: dict) -> str:
+    """One-line human readable summary (times in microseconds)."""
+    us = lambda v: f"{v * 1e6:10.2f}"
+    mem = f"  peak {res['mem_peak'] / 1024:8.1f} KiB" if res.get("mem_peak") is not None else ""
+    return (f"{res['name']:<36} n={res['iterations'] * res['number']:<8} avg{us(res['avg_time'])}  "
+            f"p50{us(res['p50'])}  p95{us(res['p95'])}  p99{us(res['p99'])} µs{mem}")
@@ -0,0 +1,279 @@
+import numpy as np
+
+import utils
+
+
+# ---------- Lookup tables ----------
+
+# "00".."FF" as ASCII bytes, indexed by channel value
+_HEX_DIGITS = np.frombuffer("".join(f"{i:02X}" for i in range(256)).encode("ascii"), dtype=np.uint8).reshape(256, 2)
+# ASCII code -> hex digit value (16 = not a hex digit)
+_HEX_VALUES = np.full(256, 16, dtype=np.uint8)
+for _i, _c in enumerate("0123456789abcdef"):
+    _HEX_VALUES[ord(_c)] = _i
+    _HEX_VALUES[ord(_c.upper())] = _i
+# round(c / 255, 4) for every channel value, same as utils.rgb_to_decimal
+_DECIMAL = np.array([round(c / 255, 4) for c in range(256)], dtype=np.float64)
+
+
+def _as_rgb_rows(color, n: int) -> np.ndarray:
+    """A single color (anything utils.classify_color accepts) or a PaletteArray, as (3, n) or (3, 1) int arrays."""
+    if isinstance(color, PaletteArray):
+        if len(color) != n:
+            raise ValueError(f"PaletteArray length mismatch: {len(color)} != {n}")
+        return color.channels
+    rgb = utils._require_color(color, ("rgb", "rgba", "hex"), "rgb/rgba/hex")[1][:3]
+    return np.array(rgb, dtype=np.uint8).reshape(3, 1)
+
+
+# ---------- HSV <-> RGB ----------
+# Array-in/array-out versions of utils.hsv_to_rgb / utils.rgb_to_hsv. They repeat the scalar
+# float64 operations in the same order (np.select instead of the if/elif chain), so integer
+# input/output matches the scalar functions bit for bit.
+
+def rgb_to_hsv_array(rgb) -> np.ndarray:
+    """
+    (..., 3) RGB -> (..., 3) float64 HSV (h 0..360, s 0..1, v 0..1).
+    - integer input is 0..255, exactly like utils.rgb_to_hsv
+    - float input is taken as 0..1
+    """
+    rgb = np.asarray(rgb)
+    if rgb.dtype.kind == "f":
+        r, g, b = (rgb[..., i].astype(np.float64) for i in range(3))
+    else:
+        r, g, b = (rgb[..., i] / 255 for i in range(3))
+    max_c = np.maximum(np.maximum(r, g), b)
+    min_c = np.minimum(np.minimum(r, g), b)
+    diff = max_c - min_c
+    safe = np.where(diff == 0, 1.0, diff)
+    h = np.select(
+        [diff == 0, max_c == r, max_c == g],
+        [0.0, (60 * ((g - b) / safe) + 360) % 360, (60 * ((b - r) / safe) + 120) % 360],
+        (60 * ((r - g) / safe) + 240) % 360,
+    )
+    s = np.where(max_c == 0, 0.0, diff / np.where(max_c == 0, 1.0, max_c))
+    return np.stack([h, s, max_c], axis=-1)
+
+
+def hsv_to_rgb_array(hsv, dtype=np.uint8) -> np.ndarray:
+    """
+    (..., 3) HSV (h in degrees, s and v 0..1) -> (..., 3) RGB.
+    - dtype=np.uint8 (default): 0..255, truncated like utils.hsv_to_rgb
+    - a float dtype: 0..1 floats (no 8-bit quantization)
+    """
+    hsv = np.asarray(hsv, dtype=np.float64)
+    h = hsv[..., 0] % 360
+    s = hsv[..., 1]
+    v = hsv[..., 2]
+    c = v * s
+    x = c * (1 - np.abs((h / 60) % 2 - 1))
+    m = v - c
+
+    sectors = [h < 60, h < 120, h < 180, h < 240, h < 300]
+    zero = np.zeros_like(c)
+    r = np.select(sectors, [c, x, zero, zero, x], c)
+    g = np.select(sectors, [x, c, c, x, zero], zero)
+    b = np.select(sectors, [zero, zero, x, c, c], x)
+    out = np.stack([r + m, g + m, b + m], axis=-1)
+    if np.dtype(dtype).kind == "f":
+        return out.astype(dtype, copy=False)
+    return (out * 255).astype(dtype)
+
+
+# ---------- PaletteArray ----------
+
+class PaletteArray:
+    """
+    Many colors in struct-of-arrays form: `channels` is a contiguous (3, N) uint8 array
+    (one row per R, G, B channel) and `alpha` an optional (N,) float64 array in 0..1.
+    That's 3 bytes per opaque color instead of ~100 for a tuple in a list.
+
+    Methods mirror the scalar utils API and return arrays / new PaletteArrays:
+    from_hsv, to_hex, to_hsv, to_decimal, blend, adjust_for_contrast, contrast, to_cmyk, out_of_gamut.
+    Slicing with a slice returns a view (no copy); an integer index returns a utils.Color.
+
+    Usage:
+        pal = PaletteArray.from_hex(hex_strings)
+        hsv = pal.to_hsv()                           # (N,3) float64
+        cmyk = pal.to_cmyk()                         # (N,4) percent, like utils.rgb_to_cmyk
+        darker = pal[1000:2000].adjust_for_contrast(adjust=-30)
+    """
+    __slots__ = ("channels", "alpha")
+
+    def __init__(self, channels: np.ndarray, alpha: np.ndarray | None = None):
+        channels = np.asarray(channels)
+        if channels.ndim != 2 or channels.shape[0] != 3 or channels.dtype != np.uint8:
+            raise ValueError("channels must be a (3, N) uint8 array; use PaletteArray.from_rgb for (N, 3) input")
+        if alpha is not None:
+            alpha = np.asarray(alpha, dtype=np.float64)
+            if alpha.shape != (channels.shape[1],):
+                raise ValueError(f"alpha must have shape ({channels.shape[1]},)")
+        self.channels = channels
+        self.alpha = alpha
+
+    # ----- construction -----
+
+    @classmethod
+    def from_rgb(cls, rgb, alpha=None):
+        """From an (N,3) or (N,4) array-like of 0..255 values (a 4th column is alpha in 0..1)."""
+        arr = np.asarray(rgb)
+        if arr.ndim != 2 or arr.shape[1] not in (3, 4):
+            raise ValueError(f"Expected an (N, 3) or (N, 4) array, got shape {arr.shape}")
+        if arr.shape[1] == 4 and alpha is None:
+            alpha = arr[:, 3].astype(np.float64)
+        rgb = arr[:, :3]
+        if rgb.dtype != np.uint8:
+            if ((rgb < 0) | (rgb > 255)).any():
+                raise ValueError("RGB values must be in 0..255")
+            rgb = np.rint(rgb).astype(np.uint8)
+        return cls(np.ascontiguousarray(rgb.T), alpha)
+
+    @classmethod
+    def from_hsv(cls, hsv, alpha=None):
+        """From an (N,3) array of HSV (h in degrees, s and v 0..1), like utils.hsv_to_rgb."""
+        return cls(np.ascontiguousarray(hsv_to_rgb_array(hsv).reshape(-1, 3).T), alpha)
+
+    @classmethod
+    def from_colors(cls, colors):
+        """From any iterable of values utils.classify_color accepts (hex, rgb()/rgba() strings, tuples, Colors)."""
+        rows, alphas, any_alpha = [], [], False
+        for color in colors:
+            values = utils._require_color(color, ("rgb", "rgba", "hex"), "rgb/rgba/hex")[1]
+            rows.append(values[:3])
+            if len(values) == 4:
+                alphas.append(values[3])
+                any_alpha = True
+            else:
+                alphas.append(1.0)
+        channels = np.array(rows, dtype=np.uint8).reshape(-1, 3).T
+        return cls(np.ascontiguousarray(channels), np.array(alphas, dtype=np.float64) if any_alpha else None)
+
+    @classmethod
+    def from_hex(cls, values):
+        """
+        Vectorized utils.hex_to_rgb over many strings. All-"#RRGGBB" input is decoded in one
+        NumPy pass; anything else (#RGB, #RRGGBBAA, mixed lengths) goes through from_colors.
+
+        >>> PaletteArray.from_hex(["#FF8800", "#FFF"]).tolist()
+        [(255, 136, 0), (255, 255, 255)]
+        """
+        arr = np.asarray(values)
+        if arr.dtype.kind != "U" or arr.ndim != 1:
+            return cls.from_colors(values)
+        if arr.size == 0:
+            return cls(np.empty((3, 0), dtype=np.uint8))
+        if not (np.char.str_len(arr) == 7).all():
+            return cls.from_colors(arr.tolist())
+        try:
+            raw = arr.astype("S7").view(np.uint8).reshape(-1, 7)
+        except UnicodeEncodeError:
+            return cls.from_colors(arr.tolist())  # reports the offending value
+        digits = _HEX_VALUES[raw[:, 1:]]
+        bad = (raw[:, 0] != ord("#")) | (digits == 16).any(axis=1)
+        if bad.any():
+            raise ValueError(f"'{arr[np.argmax(bad)]}' is not a valid hex value!")
+        rgb = digits[:, 0::2] * np.uint8(16) + digits[:, 1::2]
+        return cls(np.ascontiguousarray(rgb.T))
+
+    @classmethod
+    def from_cmyk(cls, cmyk, *, percent: bool = True, **profile_kwargs):
+        """From (N,4) CMYK through the ICC profiles (percent 0..100 by default, or device 0..255)."""
+        from utils_extra_color_conversions import cmyk_to_rgb_batch
+        cmyk = np.asarray(cmyk)
+        if percent:
+            cmyk = np.clip(np.rint(np.clip(cmyk, 0, 100) * 255.0 / 100.0), 0, 255).astype(np.uint8)
+        return cls.from_rgb(cmyk_to_rgb_batch(cmyk, **profile_kwargs))
+
+    # ----- container protocol -----
+
+    def __len__(self):
+        return self.channels.shape[1]
+
+    def __getitem__(self, index):
+        if isinstance(index, (int, np.integer)):
+            r, g, b = (int(v) for v in self.channels[:, index])
+            return utils.Color(r, g, b, float(self.alpha[index]) if self.alpha is not None else 1.0)
+        alpha = self.alpha[index] if self.alpha is not None else None
+        return PaletteArray(self.channels[:, index], alpha)
+
+    def __iter__(self):
+        return (self[i] for i in range(len(self)))
+
+    def __repr__(self):
+        return f"PaletteArray({len(self)} colors{', with alpha' if self.alpha is not None else ''})"
+
+    @property
+    def rgb(self) -> np.ndarray:
+        """(N,3) uint8 view of the channels (not contiguous; use np.ascontiguousarray for a packed copy)."""
+        return self.channels.T
+
+    @property
+    def nbytes(self) -> int:
+        return self.channels.nbytes + (self.alpha.nbytes if self.alpha is not None else 0)
+
+    def copy(self):
+        return PaletteArray(self.channels.copy(), self.alpha.copy() if self.alpha is not None else None)
+
+    def tolist(self) -> list:
+        """List of (r, g, b) or (r, g, b, a) tuples, like the scalar API uses."""
+        if self.alpha is None:
+            return list(zip(*self.channels.tolist()))
+        return list(zip(*self.channels.tolist(), self.alpha.tolist()))
+
+    # ----- vectorized counterparts of the utils helpers -----
+
+    def to_hex(self) -> np.ndarray:
+        """utils.rgb_to_hex for every color: "#RRGGBB", or "#RRGGBBAA" when the palette has alpha."""
+        n = len(self)
+        width = 7 if self.alpha is None else 9
+        out = np.empty((n, width), dtype=np.uint8)
+        out[:, 0] = ord("#")
+        for i in range(3):
+            out[:, 1 + 2 * i: 3 + 2 * i] = _HEX_DIGITS[self.channels[i]]
+        if self.alpha is not None:
+            out[:, 7:9] = _HEX_DIGITS[np.rint(self.alpha * 255).astype(np.uint8)]
+        return out.view(f"S{width}").reshape(n).astype(f"U{width}")
+
+    def to_hsv(self) -> np.ndarray:
+        """utils.rgb_to_hsv for every color: (N,3) float64 (h 0..360, s 0..1, v 0..1)."""
+        return rgb_to_hsv_array(self.rgb)
+
+    def to_decimal(self) -> np.ndarray:
+        """utils.rgb_to_decimal for every color: (N,3) float64, rounded to 4 decimals."""
+        return _DECIMAL[self.rgb]
+
+    def blend(self, bg, alpha: float):
+        """utils.blend_colors(fg=self, bg, alpha) for every color; `bg` is one color or a PaletteArray of equal length."""
+        bg = _as_rgb_rows(bg, len(self))
+        blended = np.rint(alpha * self.channels + (1 - alpha) * bg)
+        return PaletteArray(blended.astype(np.uint8))
+
+    def adjust_for_contrast(self, bg=None, adjust: int = -30):
+        """utils.adjust_color_for_contrast for every color; `bg` is None, one color, or a PaletteArray."""
+        fg = self.channels.astype(np.int16)
+        if bg is None:
+            return PaletteArray(np.clip(fg + adjust, 0, 255).astype(np.uint8))
+        bg = _as_rgb_rows(bg, len(self))
+        bg_brightness = 0.299 * bg[0] + 0.587 * bg[1] + 0.114 * bg[2]
+        fg_brightness = 0.299 * fg[0] + 0.587 * fg[1] + 0.114 * fg[2]
+        delta = np.where(fg_brightness < bg_brightness, adjust, -adjust).astype(np.int16)
+        return PaletteArray(np.clip(fg + delta, 0, 255).astype(np.uint8))
+
+    def contrast(self):
+        """utils.get_contrast_color for every color: black where the color is bright, else white."""
+        c = self.channels
+        brightness = 0.299 * c[0] + 0.587 * c[1] + 0.114 * c[2]
+        value = np.where(brightness > 186, 0, 255).astype(np.uint8)
+        return PaletteArray(np.ascontiguousarray(np.broadcast_to(value, (3, len(self)))))
+
+    # ----- ICC -----
+
+    def to_cmyk(self, *, percent: bool = True, **profile_kwargs) -> np.ndarray:
+        """utils.rgb_to_cmyk for every color in one transform call: (N,4) percent ints (or uint8 with percent=False)."""
+        from utils_extra_color_conversions import rgb_to_cmyk_batch
+        return rgb_to_cmyk_batch(np.ascontiguousarray(self.rgb), percent=percent, **profile_kwargs)
+
+    def out_of_gamut(self, *, threshold: float = 2.0, **profile_kwargs) -> np.ndarray:
+        """utils.is_out_of_gamut for every color: (N,) bool mask."""
+        from utils_extra_color_conversions import out_of_gamut_mask
+        return out_of_gamut_mask(np.ascontiguousarray(self.rgb), threshold=threshold, **profile_kwargs)
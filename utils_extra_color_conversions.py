@@ -1,11 +1,19 @@
+import os
 import re
+import hashlib
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 from typing import Tuple
+import numpy as np
 from PIL import Image, ImageCms
 
+from utils_extra_instrumentation import instrumentation
+
 
 default_rgb_profile = r"sRGB"
-default_cmyk_profile = r"Adobe_ICC_Profiles\CMYK\USWebCoatedSWOP.icc"
+default_cmyk_profile = r"Adobe_ICC_Profiles/CMYK/USWebCoatedSWOP.icc"
 
 selected_rgb_profile = default_rgb_profile
 selected_cmyk_profile = default_cmyk_profile
@@ -22,110 +30,314 @@ def _to_255_from_pct(p: float) -> int:
 def _to_pct_from_255(v8: int) -> int:
     return max(0, min(100, round(v8 * 100.0 / 255.0)))
 
+# Single-pass parsers: one precompiled fullmatch per call. Anything that isn't part of a number
+# (a "cmyk"/"rgb" prefix, brackets, commas, spaces) separates values, as before.
+_NUM = r"(\d+(?:\.\d*)?|\.\d+)"
+_CMYK_RE = re.compile(
+    r"[^0-9.%]*" + r"[^0-9.%]+".join([_NUM + r"(%?)"] * 4) + r"[^0-9.%]*"
+)
+_RGB_RE = re.compile(
+    r"\s*(?:#?([0-9a-fA-F]{6})|[^0-9]*(\d+)[^0-9]+(\d+)[^0-9]+(\d+)[^0-9]*)\s*"
+)
+
 def _parse_cmyk_string(s: str) -> Tuple[int, int, int, int]:
     """
     Accepts: "10,65,85,5", "cmyk(10,65,85,5)", "10% 65% 85% 5%", "10 65 85 5", etc.
     If any value > 100, assumes device 0..255; else 0..100 (%).
     Returns CMYK 0..255 each.
     """
-    if isinstance(s, tuple):
-        # String is already a tuple
-        toks = s
-        saw_pct = True
-        nums = toks
-    else:
-        s = s.strip().lower().replace("cmyk", "").replace("(", " ").replace(")", " ")
-        toks = [t for t in re.split(r"[^0-9.%]+", s) if t]
-
-        saw_pct = any(t.endswith("%") for t in toks)
-        nums = [float(t[:-1]) if t.endswith("%") else float(t) for t in toks]
-
-        
-
-    if len(toks) != 4:
+    if isinstance(s, (tuple, list)):
+        # Already split into values (percent)
+        if len(s) != 4:
+            raise ValueError(f"Could not parse CMYK values from: {s!r}")
+        return tuple(_to_255_from_pct(max(0, min(100, v))) for v in s)  # type: ignore[return-value]
+
+    m = _CMYK_RE.fullmatch(s)
+    if m is None:
         raise ValueError(f"Could not parse CMYK values from: {s!r}")
-    
-    if saw_pct:
-        vals = [_to_255_from_pct(v) if 0 <= v <= 100 else (_to_255_from_pct(max(0, min(100, v)))) for v in nums]
-    else:
-        if any(v > 100 for v in nums):
-            vals = [_clamp8(int(round(v))) for v in nums]
-        else:
-            vals = [_to_255_from_pct(v) for v in nums]
+    c, cp, mm, mp, y, yp, k, kp = m.groups()
+    nums = (float(c), float(mm), float(y), float(k))
 
-    
-    return tuple(vals)  # type: ignore[return-value]
+    if cp or mp or yp or kp:
+        # percent: clamp to 0..100, then scale (same rounding as _to_255_from_pct)
+        return tuple([round((v if v < 100 else 100) * 255.0 / 100.0) for v in nums])  # type: ignore[return-value]
+    if nums[0] > 100 or nums[1] > 100 or nums[2] > 100 or nums[3] > 100:
+        # device values 0..255
+        return tuple([_clamp8(round(v)) for v in nums])  # type: ignore[return-value]
+    return tuple([round(v * 255.0 / 100.0) for v in nums])  # type: ignore[return-value]
 
 def _parse_rgb_string(s: str) -> Tuple[int, int, int]:
     """
-    Accepts: "rgb(12,34,56)", "12,34,56", "12 34 56", "#0C2238", "#0c2238",
+    Accepts: "rgb(12,34,56)", "12,34,56", "12 34 56", "#0C2238", "#0c2238", utils.Color
     Returns RGB 0..255 each.
     """
     if isinstance(s, tuple):
         # String is already a tuple
         return s
-    else:
-        s = s.strip().lower()
-        # hex
-        m = re.match(r"#?([0-9a-f]{6})$", s)
-        if m:
-            h = m.group(1)
-            return int(h[0:2], 16), int(h[2:4], 16), int(h[4:6], 16)
-        # rgb()
-        s = s.replace("rgb", "").replace("(", " ").replace(")", " ")
-        toks = [t for t in re.split(r"[^0-9]+", s) if t]
-    if len(toks) != 3:
+    if not isinstance(s, str) and hasattr(s, "rgb"):
+        # utils.Color, duck-typed since utils imports this module (lazily); alpha doesn't take part in ICC conversion
+        return s.rgb
+
+    m = _RGB_RE.fullmatch(s)
+    if m is None:
         raise ValueError(f"Could not parse RGB values from: {s!r}")
-    return tuple(_clamp8(int(t)) for t in toks)  # type: ignore[return-value]
+    h, r, g, b = m.groups()
+    if h is not None:
+        return int(h[0:2], 16), int(h[2:4], 16), int(h[4:6], 16)
+    return _clamp8(int(r)), _clamp8(int(g)), _clamp8(int(b))
 
 
 # ---------- Core conversion (ICC-managed) ----------
 
-cached_icc = {}
+def _resolve_profiles(cmyk_profile: str | None, rgb_profile: str | None) -> Tuple[str, str]:
+    """Fill in the currently selected profiles for any profile argument left as None."""
+    return (cmyk_profile or selected_cmyk_profile, rgb_profile or selected_rgb_profile)
+
+class BuildCache(dict):
+    """
+    A dict whose missing entries are built exactly once, even when many threads
+    ask for the same key at the same time (single-flight). Reads of existing
+    entries are a plain lock-free dict lookup; only misses touch a lock, and
+    which lock is picked by striping on the key's hash so unrelated keys don't
+    contend. Concurrent requesters of a key being built wait for that one build.
+    """
+    def __init__(self, stripes: int = 16):
+        super().__init__()
+        self._locks = [threading.Lock() for _ in range(stripes)]
+        self._in_flight = {}  # key -> (Event, result holder)
+
+    def get_or_build(self, key, build):
+        value = self.get(key)
+        if value is not None:
+            return value
+
+        lock = self._locks[hash(key) % len(self._locks)]
+        with lock:
+            value = self.get(key)
+            if value is not None:
+                return value
+            flight = self._in_flight.get(key)
+            owner = flight is None
+            if owner:
+                flight = (threading.Event(), {})
+                self._in_flight[key] = flight
+
+        done, result = flight
+        if not owner:
+            done.wait()
+            if "error" in result:
+                raise result["error"]
+            return result["value"]
+
+        try:
+            value = build()
+            self[key] = value
+            result["value"] = value
+            return value
+        except BaseException as e:
+            result["error"] = e
+            raise
+        finally:
+            with lock:
+                del self._in_flight[key]
+            done.set()
+
+cached_icc = BuildCache()
 # Cache for built transforms (profile_pair, intent, flags, modes) -> transform
-cached_xforms = {}
+cached_xforms = BuildCache()
+
+# ---------- Profile registry ----------
+
+# Bundled profiles live next to this module, so relative profile paths work from any working directory.
+profiles_dir = Path(__file__).resolve().parent / "Adobe_ICC_Profiles"
+
+_BUILTIN_PROFILES = ("srgb", "lab")
+
+def _read_icc_header(path: Path) -> dict:
+    """
+    Read profile metadata from the 128-byte ICC header and the 'desc' tag,
+    without parsing the whole profile.
+    """
+    with open(path, "rb") as f:
+        header = f.read(132)
+        if len(header) < 132 or header[36:40] != b"acsp":
+            raise ValueError(f"Not an ICC profile: {str(path)}")
+        size = int.from_bytes(header[0:4], "big")
+        tag_count = int.from_bytes(header[128:132], "big")
+        tags = f.read(12 * min(tag_count, 256))
+
+        description = path.stem
+        for i in range(0, len(tags) - 11, 12):
+            if tags[i:i + 4] != b"desc":
+                continue
+            offset = int.from_bytes(tags[i + 4:i + 8], "big")
+            length = int.from_bytes(tags[i + 8:i + 12], "big")
+            f.seek(offset)
+            data = f.read(min(length, 4096))
+            if data[:4] == b"desc":  # v2 textDescriptionType: ASCII
+                n = int.from_bytes(data[8:12], "big")
+                description = data[12:12 + n].split(b"\0", 1)[0].decode("latin-1")
+            elif data[:4] == b"mluc":  # v4 multiLocalizedUnicodeType: first record, UTF-16BE
+                rec_len = int.from_bytes(data[20:24], "big")
+                rec_off = int.from_bytes(data[24:28], "big")
+                description = data[rec_off:rec_off + rec_len].decode("utf-16-be", "replace")
+            break
+
+    major, minor = header[8], header[9] >> 4
+    return {
+        "name": path.stem,
+        "path": str(path),
+        "description": description,
+        "device_class": header[12:16].decode("latin-1").strip(),
+        "color_space": header[16:20].decode("latin-1").strip(),
+        "pcs": header[20:24].decode("latin-1").strip(),
+        "version": f"{major}.{minor}",
+        "size": size,
+    }
+
+class ProfileRegistry:
+    """
+    Index of the ICC profiles under `profiles_dir` plus memoized resolution of
+    profile specifiers.
+    - Scanning reads only headers; full profiles are parsed lazily on first use.
+    - Every specifier (keyword, relative/absolute path, Windows-style path, bare
+      profile name) is resolved once and memoized.
+    - Profiles are keyed by content hash, so one profile reached through
+      different paths shares a single parsed object and its transforms.
+    """
+    def __init__(self, root: Path = profiles_dir):
+        self.root = Path(root)
+        self._index = None  # name (lowercase stem) -> metadata dict
+        self._lock = threading.Lock()
+        self._paths = {}    # (specifier, cwd) -> resolved path string
+        self._hashes = {}   # resolved path string -> content key
+        self._key_paths = {}  # content key -> resolved path string
+
+    def scan(self) -> dict:
+        """Index all profiles under `root` (headers only). Runs once; see `refresh()`."""
+        if self._index is None:
+            with self._lock:
+                if self._index is None:
+                    index = {}
+                    if self.root.is_dir():
+                        for p in sorted(self.root.rglob("*")):
+                            if p.suffix.lower() not in (".icc", ".icm"):
+                                continue
+                            try:
+                                index[p.stem.lower()] = _read_icc_header(p)
+                            except (OSError, ValueError):
+                                continue
+                    self._index = index
+        return self._index
+
+    def refresh(self):
+        """Forget the index and all memoized keys (e.g. after profile files changed on disk)."""
+        with self._lock:
+            self._index = None
+            self._paths.clear()
+            self._hashes.clear()
+            self._key_paths.clear()
+
+    def list(self, color_space: str | None = None) -> list:
+        """Metadata dicts of the bundled profiles, optionally filtered by color space ("CMYK", "RGB")."""
+        profiles = self.scan().values()
+        if color_space is not None:
+            profiles = [p for p in profiles if p["color_space"].upper() == color_space.upper()]
+        return list(profiles)
+
+    def info(self, path_or_keyword: str) -> dict:
+        """Header metadata for any profile specifier."""
+        key = self.resolve_path(path_or_keyword)
+        if key in _BUILTIN_PROFILES:
+            return {"name": key, "path": None, "color_space": "RGB" if key == "srgb" else "Lab"}
+        return _read_icc_header(Path(key))
+
+    def resolve_path(self, path_or_keyword: str) -> str:
+        """
+        Resolve a specifier to 'srgb', 'lab' or an absolute file path.
+        Tries, in order: built-in keywords, the path as given (relative to the
+        working directory), relative to this module, and (for bare names without
+        a directory part) bundled profile names.
+        """
+        s = str(path_or_keyword).strip()
+        memo_key = (s, os.getcwd())
+        resolved = self._paths.get(memo_key)
+        if resolved is not None:
+            return resolved
+
+        if s.lower() in _BUILTIN_PROFILES:
+            resolved = s.lower()
+        else:
+            # Accept Windows-style separators on every platform
+            p = Path(s.replace("\\", "/") if os.sep == "/" else s).expanduser()
+            candidates = [p] if p.is_absolute() else [Path.cwd() / p, self.root.parent / p]
+            resolved = next((str(c.resolve()) for c in candidates if c.is_file()), None)
+            if resolved is None and p.parent == Path("."):
+                # Only a bare name may stand for a bundled profile; a missing path with a
+                # directory part stays as given so content_key raises FileNotFoundError
+                entry = self.scan().get(Path(p.name).stem.lower())
+                resolved = entry["path"] if entry else None
+            if resolved is None:
+                resolved = str(candidates[0].resolve())
+        self._paths[memo_key] = resolved
+        return resolved
+
+    def content_key(self, path_or_keyword: str) -> str:
+        """Content-hash key of a profile ('srgb' / 'lab' for the built-ins)."""
+        path = self.resolve_path(path_or_keyword)
+        key = self._hashes.get(path)
+        if key is not None:
+            return key
+        if path in _BUILTIN_PROFILES:
+            key = path
+        else:
+            try:
+                data = Path(path).read_bytes()
+            except FileNotFoundError:
+                raise FileNotFoundError(
+                    f"ICC profile not found: {path_or_keyword!r}\nResolved to: {path}"
+                ) from None
+            key = hashlib.sha256(data).hexdigest()[:16]
+        self._hashes[path] = key
+        self._key_paths.setdefault(key, path)
+        return key
+
+    def path_for_key(self, key: str) -> str:
+        """A file path (or built-in keyword) holding the profile with this content key."""
+        return key if key in _BUILTIN_PROFILES else self._key_paths[key]
+
+profile_registry = ProfileRegistry()
 
 def _canonical_profile_key(path_or_keyword: str) -> str:
     """Return a stable canonical key for a profile specifier.
     - 'srgb' -> 'srgb'
-    - other paths -> absolute resolved string path
+    - 'lab' -> 'lab' (built-in D50 Lab, used for ΔE measurements)
+    - files -> hash of the profile's contents
     This lets us use the same keys whether callers pass 'sRGB', ' srgb ',
-    or a relative path vs an absolute path.
+    a relative path, an absolute path, or another copy of the same profile.
     """
-    s = str(path_or_keyword).strip()
-    if s.lower() == "srgb":
-        return "srgb"
-    p = Path(s).expanduser()
-    if not p.is_absolute():
-        p = (Path.cwd() / p).resolve()
-    return str(p)
+    return profile_registry.content_key(path_or_keyword)
 
 def _open_icc(path_or_keyword: str):
-    # Normalize key so we reliably cache the same profile regardless of
-    # minor differences in the input (case, whitespace, relative vs absolute).
+    # Profiles are cached by content, so the same profile is only parsed once
+    # no matter how it was specified.
     key = _canonical_profile_key(path_or_keyword)
+    return cached_icc.get_or_build(key, lambda: _load_icc(key))
 
-    if key in cached_icc:
-        return cached_icc[key]
-
+def _load_icc(key: str):
     if key == "srgb":
         print("Created new sRGB profile")
-        profile = ImageCms.createProfile("sRGB")
-        cached_icc[key] = profile
-        return profile
-
-    p = Path(key)
-    if not p.is_file():
-        raise FileNotFoundError(
-            f"ICC profile not found: {path_or_keyword!r}\nResolved to: {str(p)}"
-        )
+        return ImageCms.createProfile("sRGB")
+
+    if key == "lab":
+        return ImageCms.createProfile("LAB")
+
+    p = profile_registry.path_for_key(key)
     print(f"Loaded new {p} profile")
-    profile = ImageCms.getOpenProfile(str(p))
-    cached_icc[key] = profile
-    return profile
+    return ImageCms.getOpenProfile(p)
 
 def _get_cached_transform(from_profile, to_profile, from_mode: str, to_mode: str, intent: int, flags: int):
-    """Return a cached transform for the given profile specs or build & cache one."""
+    """Return a cached transform for the given profile specs or build & cache one (safe to call from threads)."""
     key = (
         _canonical_profile_key(from_profile),
         _canonical_profile_key(to_profile),
@@ -134,17 +346,18 @@ def _get_cached_transform(from_profile, to_profile, from_mode: str, to_mode: str
         int(intent),
         int(flags),
     )
-    if key in cached_xforms:
-        return cached_xforms[key]
-
-    prof_from = _open_icc(from_profile)
-    prof_to = _open_icc(to_profile)
-    xform = ImageCms.buildTransformFromOpenProfiles(
-        prof_from, prof_to, from_mode, to_mode,
-        renderingIntent=intent, flags=flags
-    )
-    cached_xforms[key] = xform
-    return xform
+    xform = cached_xforms.get(key)
+    if xform is not None:
+        return xform
+
+    def build():
+        prof_from = _open_icc(from_profile)
+        prof_to = _open_icc(to_profile)
+        return ImageCms.buildTransformFromOpenProfiles(
+            prof_from, prof_to, from_mode, to_mode,
+            renderingIntent=intent, flags=flags
+        )
+    return cached_xforms.get_or_build(key, build)
 
 class FastCMYKtoRGB:
     def __init__(self, mode: str, xform):
@@ -161,8 +374,144 @@ class FastCMYKtoRGB:
         return out.getpixel((0, 0))
     
 
-perf_test_enabled = False
-perf_test_iterations = 25
+# ---------- Background warm-up ----------
+
+def _warm(cmyk_profiles, rgb_profile, intent, flags):
+    for cmyk_profile in cmyk_profiles:
+        try:
+            _get_cached_transform(rgb_profile, cmyk_profile, "RGB", "CMYK", intent, flags)
+            _get_cached_transform(cmyk_profile, rgb_profile, "CMYK", "RGB", intent, flags)
+        except Exception as e:
+            # A bad profile shouldn't stop the others; the real conversion will raise it again
+            print(f"Color warm-up skipped {cmyk_profile!r}: {e}")
+
+def start_color_warmup(
+    cmyk_profiles: list | None = None,
+    rgb_profile: str | None = None,
+    *,
+    intent: int = ImageCms.Intent.RELATIVE_COLORIMETRIC,
+    black_point_compensation: bool = True,
+) -> threading.Thread:
+    """
+    Load profiles and build the RGB<->CMYK transforms on a background thread,
+    so the first conversion doesn't stall on them. Defaults to the selected profiles.
+    Conversions that arrive before warm-up finishes only wait if they need the
+    exact transform currently being built (see BuildCache); anything else
+    proceeds immediately. Returns the (daemon) thread; join() it to wait.
+    Set the VOIDS_COLOR_WARMUP=1 environment variable to start this at import time.
+    """
+    if cmyk_profiles is None:
+        cmyk_profiles = [selected_cmyk_profile]
+    flags = ImageCms.Flags.BLACKPOINTCOMPENSATION if black_point_compensation else 0
+    t = threading.Thread(
+        target=_warm, args=(list(cmyk_profiles), rgb_profile or selected_rgb_profile, intent, flags),
+        name="color-warmup", daemon=True,
+    )
+    t.start()
+    return t
+
+
+# ---------- Result memoization for single-color conversions ----------
+
+class ConversionCache:
+    """
+    Size-bounded LRU cache of single-color conversion results, keyed on
+    (direction, device color, cmyk profile, rgb profile, intent, BPC).
+    Repeated conversions (slider drags, re-opened pickers) become dict lookups.
+    Set maxsize to 0 to disable.
+    Each entry also remembers the canonical keys of its two profiles, so
+    `invalidate(profile)` doesn't re-hash profiles under the lock.
+    """
+    def __init__(self, maxsize: int = 4096):
+        self.maxsize = maxsize
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key):
+        with self._lock:
+            try:
+                value = self._data[key]
+            except KeyError:
+                self.misses += 1
+                return None
+            self._data.move_to_end(key)
+            self.hits += 1
+            return value[0]
+
+    def put(self, key, value):
+        if self.maxsize <= 0:
+            return
+        profiles = (_profile_match_key(key[2]), _profile_match_key(key[3]))
+        with self._lock:
+            self._data[key] = (value, profiles)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+                self.evictions += 1
+
+    def resize(self, maxsize: int):
+        """Change the size bound, evicting the least recently used entries if needed."""
+        with self._lock:
+            self.maxsize = maxsize
+            while len(self._data) > max(maxsize, 0):
+                self._data.popitem(last=False)
+                self.evictions += 1
+
+    def invalidate(self, profile: str | None = None) -> int:
+        """
+        Drop cached results. With `profile`, only entries converted through that
+        profile are dropped. Returns the number of entries removed.
+        """
+        if profile is None:
+            with self._lock:
+                removed = len(self._data)
+                self._data.clear()
+                return removed
+        target = _profile_match_key(profile)
+        with self._lock:
+            stale = [key for key, (_, profiles) in self._data.items() if target in profiles]
+            for key in stale:
+                del self._data[key]
+            return len(stale)
+
+    def stats(self) -> dict:
+        """Return hits, misses, evictions, size, maxsize and hit_rate."""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "size": len(self._data),
+                "maxsize": self.maxsize,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+            }
+
+def _profile_match_key(profile: str) -> str:
+    """Canonical key of a profile, or the stripped specifier itself if it can't be resolved."""
+    try:
+        return _canonical_profile_key(profile)
+    except OSError:
+        return str(profile).strip()
+
+conversion_cache = ConversionCache()
+
+def set_selected_profiles(cmyk_profile: str | None = None, rgb_profile: str | None = None):
+    """
+    Change the profiles used when a conversion is called without explicit
+    profiles, and drop memoized results for the profiles being replaced.
+    """
+    global selected_cmyk_profile, selected_rgb_profile
+    if cmyk_profile is not None and cmyk_profile != selected_cmyk_profile:
+        conversion_cache.invalidate(selected_cmyk_profile)
+        selected_cmyk_profile = cmyk_profile
+    if rgb_profile is not None and rgb_profile != selected_rgb_profile:
+        conversion_cache.invalidate(selected_rgb_profile)
+        selected_rgb_profile = rgb_profile
+
 
 def cmyk_to_rgb(
     cmyk_string: str | int | float,
@@ -170,8 +519,8 @@ def cmyk_to_rgb(
     y: int | float | None = None,
     k: int | float | None = None,
     *,
-    cmyk_profile: str = selected_cmyk_profile,
-    rgb_profile: str = selected_rgb_profile,
+    cmyk_profile: str | None = None,
+    rgb_profile: str | None = None,
     intent: int = ImageCms.Intent.RELATIVE_COLORIMETRIC,
     black_point_compensation: bool = True,
     out_format: str = "tuple"  # "tuple" or "str"
@@ -180,56 +529,39 @@ def cmyk_to_rgb(
     Convert a CMYK data string to an RGB string using ICC profiles.
     - cmyk_icc_path: path to the CMYK ICC profile used in Photoshop (e.g., USWebCoatedSWOP.icc)
     - rgb_profile: "sRGB" (built-in) or a path to the RGB working ICC (e.g., AdobeRGB1998.icc)
+    Stage timings are recorded under "cmyk_to_rgb.*" when `instrumentation` is enabled.
     """
     # 1) Parse
-    cmyk_string = tuple(x for x in (cmyk_string, m, y, k) if x is not None) if (m is not None and y is not None and k is not None) else cmyk_string
-    #print(f"received cmyk_string: {cmyk_string}")
-    c8, m8, y8, k8 = _parse_cmyk_string(cmyk_string)
-
-    if perf_test_enabled:
-        test_func = measure_performance(_parse_cmyk_string, cmyk_string, iterations=perf_test_iterations)
-        print(f"Parsing CMYK Average time: {test_func['avg_time']:.6f}s")
-        print(f"Parsing CMYK Total time: {test_func['total_time']:.6f}s")
-        print()
+    with instrumentation.span("cmyk_to_rgb.parse"):
+        cmyk_string = tuple(x for x in (cmyk_string, m, y, k) if x is not None) if (m is not None and y is not None and k is not None) else cmyk_string
+        #print(f"received cmyk_string: {cmyk_string}")
+        c8, m8, y8, k8 = _parse_cmyk_string(cmyk_string)
+
+    cmyk_profile, rgb_profile = _resolve_profiles(cmyk_profile, rgb_profile)
+    cache_key = ("cmyk->rgb", (c8, m8, y8, k8), cmyk_profile, rgb_profile, int(intent), bool(black_point_compensation))
+    cached = conversion_cache.get(cache_key)
+    if cached is not None:
+        instrumentation.count("cmyk_to_rgb.cache_hit")
+        r, g, b = cached
+        return f"rgb({r},{g},{b})" if out_format == "str" else cached
+    instrumentation.count("cmyk_to_rgb.cache_miss")
 
     # 2) Build the ICC transform: CMYK -> RGB
-    prof_cmyk = _open_icc(cmyk_profile)
-
-    if perf_test_enabled:
-        test_func = measure_performance(_open_icc, cmyk_profile, iterations=perf_test_iterations)
-        print(f"_open_icc (CMYK) Average time: {test_func['avg_time']:.6f}s")
-        print(f"_open_icc (CMYK) Total time: {test_func['total_time']:.6f}s")
-        print()
-
-    prof_rgb  = _open_icc(rgb_profile)
-
-    if perf_test_enabled:
-        test_func = measure_performance(_open_icc, rgb_profile, iterations=perf_test_iterations)
-        print(f"_open_icc (RGB) Average time: {test_func['avg_time']:.6f}s")
-        print(f"_open_icc (RGB) Total time: {test_func['total_time']:.6f}s")
-        print()
+    with instrumentation.span("cmyk_to_rgb.profile_lookup"):
+        prof_cmyk = _open_icc(cmyk_profile)
+        prof_rgb  = _open_icc(rgb_profile)
 
     flags = ImageCms.Flags.BLACKPOINTCOMPENSATION if black_point_compensation else 0
 
     # Use a cached transform instead of rebuilding the transform every call
-    xform = _get_cached_transform(cmyk_profile, rgb_profile, "CMYK", "RGB", intent, flags)
+    with instrumentation.span("cmyk_to_rgb.transform_lookup"):
+        xform = _get_cached_transform(cmyk_profile, rgb_profile, "CMYK", "RGB", intent, flags)
 
     # 3) Apply transform to a 1×1 “image” swatch
-    helper = FastCMYKtoRGB("RGB", xform)
-
-    if perf_test_enabled:
-        test_func = measure_performance(FastCMYKtoRGB, "RGB", xform, iterations=perf_test_iterations)
-        print(f"FastCMYKtoRGB init Average time: {test_func['avg_time']:.6f}s")
-        print(f"FastCMYKtoRGB init Total time: {test_func['total_time']:.6f}s")
-        print()
-
-    r, g, b = helper.convert_cmyk_to_rgb(c8, m8, y8, k8)
-
-    if perf_test_enabled:
-        test_func = measure_performance(helper.convert_cmyk_to_rgb, c8, m8, y8, k8, iterations=perf_test_iterations)
-        print(f"convert_cmyk_to_rgb Average time: {test_func['avg_time']:.6f}s")
-        print(f"convert_cmyk_to_rgb Total time: {test_func['total_time']:.6f}s")
-        print()
+    with instrumentation.span("cmyk_to_rgb.apply"):
+        helper = FastCMYKtoRGB("CMYK", xform)
+        r, g, b = helper.convert_cmyk_to_rgb(c8, m8, y8, k8)
+    conversion_cache.put(cache_key, (r, g, b))
 
     # 4) Format output
     if out_format == "str":
@@ -245,8 +577,8 @@ def rgb_to_cmyk(
     g: int | float | None = None,
     b: int | float | None = None,
     *,
-    cmyk_profile: str = selected_cmyk_profile,
-    rgb_profile: str = selected_rgb_profile,
+    cmyk_profile: str | None = None,
+    rgb_profile: str | None = None,
     intent: int = ImageCms.Intent.RELATIVE_COLORIMETRIC,
     black_point_compensation: bool = True,
     out_format: str = "tuple"  # "tuple" or "str"
@@ -254,29 +586,487 @@ def rgb_to_cmyk(
     
 
     # 1) Parse
-    rgb_string = tuple(x for x in (rgb_string, g, b) if x is not None) if (g is not None and b is not None) else rgb_string
-    #print(f"received rgb_string: {rgb_string}")
+    with instrumentation.span("rgb_to_cmyk.parse"):
+        rgb_string = tuple(x for x in (rgb_string, g, b) if x is not None) if (g is not None and b is not None) else rgb_string
+        #print(f"received rgb_string: {rgb_string}")
+
+        r8, g8, b8 = _parse_rgb_string(rgb_string)
+
+    cmyk_profile, rgb_profile = _resolve_profiles(cmyk_profile, rgb_profile)
+    cache_key = ("rgb->cmyk", (r8, g8, b8), cmyk_profile, rgb_profile, int(intent), bool(black_point_compensation))
+    cached = conversion_cache.get(cache_key)
+    if cached is not None:
+        instrumentation.count("rgb_to_cmyk.cache_hit")
+        c, m, y, k = cached
+    else:
+        instrumentation.count("rgb_to_cmyk.cache_miss")
+        c, m, y, k = _rgb_to_cmyk_uncached(r8, g8, b8, cmyk_profile, rgb_profile, intent, black_point_compensation)
+        conversion_cache.put(cache_key, (c, m, y, k))
+
+    # 4) Format output
+    if out_format == "str":
+        return f"cmyk({c},{m},{y},{k})"
+    
+    return _to_pct_from_255(c), _to_pct_from_255(m), _to_pct_from_255(y), _to_pct_from_255(k)
 
-    r8, g8, b8 = _parse_rgb_string(rgb_string)
 
-    # 2) Build the ICC transform: CMYK -> RGB
-    prof_cmyk = _open_icc(cmyk_profile)
-    prof_rgb  = _open_icc(rgb_profile)
+def _rgb_to_cmyk_uncached(r8, g8, b8, cmyk_profile, rgb_profile, intent, black_point_compensation):
+    # 2) Build the ICC transform: RGB -> CMYK
+    with instrumentation.span("rgb_to_cmyk.profile_lookup"):
+        prof_cmyk = _open_icc(cmyk_profile)
+        prof_rgb  = _open_icc(rgb_profile)
     flags = ImageCms.Flags.BLACKPOINTCOMPENSATION if black_point_compensation else 0
 
     # Use cached transform for RGB->CMYK
-    xform = _get_cached_transform(rgb_profile, cmyk_profile, "RGB", "CMYK", intent, flags)
+    with instrumentation.span("rgb_to_cmyk.transform_lookup"):
+        xform = _get_cached_transform(rgb_profile, cmyk_profile, "RGB", "CMYK", intent, flags)
 
     # 3) Apply transform to a 1×1 “image” swatch
-    helper = FastCMYKtoRGB("CMYK", xform)
+    with instrumentation.span("rgb_to_cmyk.apply"):
+        helper = FastCMYKtoRGB("RGB", xform)
+        return helper.convert_rgb_to_cmyk(r8, g8, b8)
 
-    c, m, y, k = helper.convert_rgb_to_cmyk(r8, g8, b8)
 
-    # 4) Format output
-    if out_format == "str":
-        return f"cmyk({c},{m},{y},{k})"
-    
-    return _to_pct_from_255(c), _to_pct_from_255(m), _to_pct_from_255(y), _to_pct_from_255(k)
+# ---------- Batch conversion (ICC-managed) ----------
+
+def _as_color_array(colors, channels: int, parse) -> np.ndarray:
+    """
+    Normalize batch input into a contiguous (N, channels) uint8 array.
+    - NumPy arrays / raw buffers (bytes, bytearray, memoryview) are taken as device 0..255 values.
+      Arrays must be (N, channels); 1-D arrays and buffers are read as packed pixels and
+      must hold a whole number of colors.
+    - Lists/tuples of colors are parsed one by one with `parse`, same as the single-color functions.
+    """
+    if isinstance(colors, (bytes, bytearray, memoryview)):
+        arr = np.frombuffer(colors, dtype=np.uint8)
+    elif isinstance(colors, np.ndarray):
+        arr = colors
+    else:
+        arr = np.array([parse(c) for c in colors], dtype=np.uint8)
+
+    if arr.size == 0:
+        return np.empty((0, channels), dtype=np.uint8)
+    if not ((arr.ndim == 2 and arr.shape[1] == channels) or (arr.ndim == 1 and arr.size % channels == 0)):
+        raise ValueError(
+            f"Expected an (N, {channels}) array or a packed buffer of {channels}-channel pixels, got shape {arr.shape}"
+        )
+    if arr.dtype != np.uint8:
+        arr = np.clip(np.rint(arr), 0, 255).astype(np.uint8)
+    arr = arr.reshape(-1, channels)
+    return np.ascontiguousarray(arr)
+
+def _apply_transform_batch(arr: np.ndarray, xform, from_mode: str, to_mode: str) -> np.ndarray:
+    """Pack (N, C) pixels into one N×1 image, run the transform once, and unpack the result."""
+    n = arr.shape[0]
+    out_channels = len(to_mode)
+    if n == 0:
+        return np.empty((0, out_channels), dtype=np.uint8)
+    with instrumentation.span(f"batch.apply.{from_mode}->{to_mode}"):
+        src = Image.frombuffer(from_mode, (n, 1), arr.tobytes(), "raw", from_mode, 0, 1)
+        out = ImageCms.applyTransform(src, xform)
+    instrumentation.count("batch.pixels", n)
+    return np.asarray(out, dtype=np.uint8).reshape(n, out_channels)
+
+def cmyk_to_rgb_batch(
+    colors,
+    *,
+    cmyk_profile: str | None = None,
+    rgb_profile: str | None = None,
+    intent: int = ImageCms.Intent.RELATIVE_COLORIMETRIC,
+    black_point_compensation: bool = True,
+) -> np.ndarray:
+    """
+    Convert many CMYK colors to RGB with a single ICC transform call.
+    - colors: a list of anything `cmyk_to_rgb` accepts, an (N,4) uint8 array, or a raw CMYK byte buffer
+    Returns an (N,3) uint8 array of RGB values.
+    """
+    arr = _as_color_array(colors, 4, _parse_cmyk_string)
+    cmyk_profile, rgb_profile = _resolve_profiles(cmyk_profile, rgb_profile)
+    flags = ImageCms.Flags.BLACKPOINTCOMPENSATION if black_point_compensation else 0
+    xform = _get_cached_transform(cmyk_profile, rgb_profile, "CMYK", "RGB", intent, flags)
+    return _apply_transform_batch(arr, xform, "CMYK", "RGB")
+
+def rgb_to_cmyk_batch(
+    colors,
+    *,
+    cmyk_profile: str | None = None,
+    rgb_profile: str | None = None,
+    intent: int = ImageCms.Intent.RELATIVE_COLORIMETRIC,
+    black_point_compensation: bool = True,
+    percent: bool = False,
+) -> np.ndarray:
+    """
+    Convert many RGB colors to CMYK with a single ICC transform call.
+    - colors: a list of anything `rgb_to_cmyk` accepts, an (N,3) uint8 array, or a raw RGB byte buffer
+    - percent: if True, return 0..100 values (same rounding as `rgb_to_cmyk`) instead of 0..255
+    Returns an (N,4) uint8 array of CMYK values.
+    """
+    arr = _as_color_array(colors, 3, _parse_rgb_string)
+    cmyk_profile, rgb_profile = _resolve_profiles(cmyk_profile, rgb_profile)
+    flags = ImageCms.Flags.BLACKPOINTCOMPENSATION if black_point_compensation else 0
+    xform = _get_cached_transform(rgb_profile, cmyk_profile, "RGB", "CMYK", intent, flags)
+    out = _apply_transform_batch(arr, xform, "RGB", "CMYK")
+    if percent:
+        out = np.clip(np.rint(out * 100.0 / 255.0), 0, 100).astype(np.uint8)
+    return out
+
+
+# ---------- Bulk parsing ----------
+
+def iter_parse_colors(source, kind: str = "rgb", *, chunk_size: int = 65536, encoding: str = "utf-8"):
+    """
+    Stream color strings (one per line) into NumPy chunks without stopping at bad lines.
+    - source: a file path, an open text file, or any iterable of strings
+    - kind: "rgb" (anything `rgb_to_cmyk` accepts) or "cmyk" (anything `cmyk_to_rgb` accepts)
+    Yields (colors, errors) per chunk of up to `chunk_size` lines:
+    - colors: (N,3) or (N,4) uint8 array of the lines that parsed, in order, ready for the batch functions
+    - errors: list of (line_number, line, message) for lines that didn't (1-based line numbers)
+    Blank lines are skipped.
+
+    Usage:
+        for colors, errors in iter_parse_colors("swatches.txt", "rgb"):
+            cmyk = rgb_to_cmyk_batch(colors)
+    """
+    if kind == "rgb":
+        parse, channels = _parse_rgb_string, 3
+    elif kind == "cmyk":
+        parse, channels = _parse_cmyk_string, 4
+    else:
+        raise ValueError(f"kind must be 'rgb' or 'cmyk', not {kind!r}")
+
+    if isinstance(source, (str, os.PathLike)):
+        with open(source, "r", encoding=encoding, errors="replace") as f:
+            yield from iter_parse_colors(f, kind, chunk_size=chunk_size)
+        return
+
+    buf = bytearray()
+    errors = []
+    lines_in_chunk = 0
+    for line_number, line in enumerate(source, 1):
+        line = line.strip()
+        if line:
+            try:
+                buf += bytes(parse(line))
+            except (ValueError, TypeError) as e:
+                errors.append((line_number, line, str(e)))
+        lines_in_chunk += 1
+        if lines_in_chunk >= chunk_size:
+            yield np.frombuffer(bytes(buf), dtype=np.uint8).reshape(-1, channels), errors
+            buf = bytearray()
+            errors = []
+            lines_in_chunk = 0
+    if lines_in_chunk:
+        yield np.frombuffer(bytes(buf), dtype=np.uint8).reshape(-1, channels), errors
+
+def parse_colors(source, kind: str = "rgb", **kwargs) -> Tuple[np.ndarray, list]:
+    """
+    Parse a whole file/iterable of color strings at once (see `iter_parse_colors`).
+    Returns (colors, errors): an (N,3)/(N,4) uint8 array and the list of (line_number, line, message).
+    """
+    chunks, errors = [], []
+    for colors, errs in iter_parse_colors(source, kind, **kwargs):
+        chunks.append(colors)
+        errors.extend(errs)
+    channels = 3 if kind == "rgb" else 4
+    colors = np.concatenate(chunks) if chunks else np.empty((0, channels), dtype=np.uint8)
+    return colors, errors
+
+
+# ---------- Reusable converter bound to a profile pair ----------
+
+class ColorConverter:
+    """
+    A conversion session bound to one CMYK/RGB profile pair, intent and BPC setting.
+    Profiles are resolved and both transforms (RGB->CMYK and CMYK->RGB) are
+    fetched once up front, and the 1×1 source/destination pixels are allocated
+    once and reused, so each conversion skips straight to the transform.
+
+        conv = ColorConverter(cmyk_profile="CoatedFOGRA39")
+        conv.rgb_to_cmyk(12, 200, 99)      # -> (c, m, y, k) in 0..100
+        conv.cmyk_to_rgb_batch(cmyk_array) # -> (N,3) uint8 array
+    """
+    def __init__(
+        self,
+        cmyk_profile: str | None = None,
+        rgb_profile: str | None = None,
+        *,
+        intent: int = ImageCms.Intent.RELATIVE_COLORIMETRIC,
+        black_point_compensation: bool = True,
+    ):
+        self.cmyk_profile, self.rgb_profile = _resolve_profiles(cmyk_profile, rgb_profile)
+        self.intent = int(intent)
+        self.black_point_compensation = bool(black_point_compensation)
+        flags = ImageCms.Flags.BLACKPOINTCOMPENSATION if black_point_compensation else 0
+
+        self._to_cmyk = _get_cached_transform(self.rgb_profile, self.cmyk_profile, "RGB", "CMYK", intent, flags)
+        self._to_rgb = _get_cached_transform(self.cmyk_profile, self.rgb_profile, "CMYK", "RGB", intent, flags)
+
+        # Preallocated single-pixel buffers; the lock keeps threads from sharing them mid-conversion
+        self._rgb_px = Image.new("RGB", (1, 1))
+        self._cmyk_px = Image.new("CMYK", (1, 1))
+        self._rgb_out = Image.new("RGB", (1, 1))
+        self._cmyk_out = Image.new("CMYK", (1, 1))
+        self._lock = threading.Lock()
+
+        # Same memo keys as the module-level functions, so both share results
+        self._key_tail = (self.cmyk_profile, self.rgb_profile, self.intent, self.black_point_compensation)
+
+    def rgb_to_cmyk_255(self, r8: int, g8: int, b8: int) -> tuple:
+        """Convert one RGB color (0..255) to device CMYK 0..255."""
+        key = ("rgb->cmyk", (r8, g8, b8)) + self._key_tail
+        cached = conversion_cache.get(key)
+        if cached is not None:
+            return cached
+        with self._lock:
+            self._rgb_px.putpixel((0, 0), (r8, g8, b8))
+            self._to_cmyk.apply(self._rgb_px, self._cmyk_out)
+            cmyk = self._cmyk_out.getpixel((0, 0))
+        conversion_cache.put(key, cmyk)
+        return cmyk
+
+    def cmyk_to_rgb_255(self, c8: int, m8: int, y8: int, k8: int) -> tuple:
+        """Convert one device CMYK color (0..255) to RGB 0..255."""
+        key = ("cmyk->rgb", (c8, m8, y8, k8)) + self._key_tail
+        cached = conversion_cache.get(key)
+        if cached is not None:
+            return cached
+        with self._lock:
+            self._cmyk_px.putpixel((0, 0), (c8, m8, y8, k8))
+            self._to_rgb.apply(self._cmyk_px, self._rgb_out)
+            rgb = self._rgb_out.getpixel((0, 0))
+        conversion_cache.put(key, rgb)
+        return rgb
+
+    def rgb_to_cmyk(self, rgb_string, g=None, b=None, *, out_format: str = "tuple"):
+        """Same inputs and outputs as the module-level `rgb_to_cmyk`."""
+        if g is not None and b is not None:
+            rgb_string = (rgb_string, g, b)
+        c, m, y, k = self.rgb_to_cmyk_255(*_parse_rgb_string(rgb_string))
+        if out_format == "str":
+            return f"cmyk({c},{m},{y},{k})"
+        return _to_pct_from_255(c), _to_pct_from_255(m), _to_pct_from_255(y), _to_pct_from_255(k)
+
+    def cmyk_to_rgb(self, cmyk_string, m=None, y=None, k=None, *, out_format: str = "tuple"):
+        """Same inputs and outputs as the module-level `cmyk_to_rgb`."""
+        if m is not None and y is not None and k is not None:
+            cmyk_string = (cmyk_string, m, y, k)
+        r, g, b = self.cmyk_to_rgb_255(*_parse_cmyk_string(cmyk_string))
+        if out_format == "str":
+            return f"rgb({r},{g},{b})"
+        return r, g, b
+
+    def rgb_to_cmyk_batch(self, colors, *, percent: bool = False) -> np.ndarray:
+        """Same as the module-level `rgb_to_cmyk_batch`, with the transform already bound."""
+        out = _apply_transform_batch(_as_color_array(colors, 3, _parse_rgb_string), self._to_cmyk, "RGB", "CMYK")
+        if percent:
+            out = np.clip(np.rint(out * 100.0 / 255.0), 0, 100).astype(np.uint8)
+        return out
+
+    def cmyk_to_rgb_batch(self, colors) -> np.ndarray:
+        """Same as the module-level `cmyk_to_rgb_batch`, with the transform already bound."""
+        return _apply_transform_batch(_as_color_array(colors, 4, _parse_cmyk_string), self._to_rgb, "CMYK", "RGB")
+
+
+def _lab_from_batch(
+    arr: np.ndarray,
+    profile: str,
+    mode: str,
+    intent: int = ImageCms.Intent.RELATIVE_COLORIMETRIC,
+    flags: int = 0,
+) -> np.ndarray:
+    """Convert (N, C) device values in `profile` to an (N,3) float32 array of L*a*b* values."""
+    xform = _get_cached_transform(profile, "lab", mode, "LAB", intent, flags)
+    raw = _apply_transform_batch(arr, xform, mode, "LAB")
+    lab = np.empty(raw.shape, dtype=np.float32)
+    # Pillow stores L as 0..255 and a/b as signed bytes
+    lab[:, 0] = raw[:, 0] * (100.0 / 255.0)
+    lab[:, 1:] = raw[:, 1:].view(np.int8)
+    return lab
+
+def delta_e_76(lab1: np.ndarray, lab2: np.ndarray) -> np.ndarray:
+    """CIE76 color difference between two (N,3) L*a*b* arrays."""
+    diff = np.asarray(lab1, dtype=np.float32) - np.asarray(lab2, dtype=np.float32)
+    return np.sqrt(np.einsum("ij,ij->i", diff, diff))
+
+
+# ---------- Gamut checking ----------
+
+# Per-settings 24-bit ΔE tables: one float32 per RGB color (64 MB each), NaN until the
+# color has been seen. float32 is the precision small batches get too, so a color's ΔE
+# (and its out-of-gamut verdict) doesn't depend on how many other colors were checked with it.
+# Only the `gamut_table_limit` most recently used settings (profile pair, intent, BPC) keep
+# their table, i.e. at most 128 MB by default. Clear this to release the memory.
+cached_gamut_tables = BuildCache()
+gamut_table_limit = 2
+_gamut_table_order = OrderedDict()  # settings key -> None, least recently used first
+_gamut_table_lock = threading.Lock()
+
+# Unique colors are round-tripped in chunks of this many (bounds the temporary arrays and
+# lets several chunks run at once, since LCMS releases the GIL)
+gamut_chunk_size = 1 << 18
+
+def _round_trip_delta_e(rgb: np.ndarray, cmyk_profile, rgb_profile, intent, black_point_compensation) -> np.ndarray:
+    kwargs = dict(
+        cmyk_profile=cmyk_profile, rgb_profile=rgb_profile,
+        intent=intent, black_point_compensation=black_point_compensation,
+    )
+    round_trip = cmyk_to_rgb_batch(rgb_to_cmyk_batch(rgb, **kwargs), **kwargs)
+    return delta_e_76(
+        _lab_from_batch(rgb, rgb_profile, "RGB", intent),
+        _lab_from_batch(round_trip, rgb_profile, "RGB", intent),
+    )
+
+def _gamut_table(key) -> dict:
+    """The ΔE table for `key`, marked most recently used; evicts tables beyond `gamut_table_limit`."""
+    table = cached_gamut_tables.get_or_build(key, lambda: {
+        "delta_e": np.full(1 << 24, np.nan, dtype=np.float32),
+        "lock": threading.Lock(),
+    })
+    with _gamut_table_lock:
+        _gamut_table_order[key] = None
+        _gamut_table_order.move_to_end(key)
+        while len(_gamut_table_order) > max(gamut_table_limit, 1):
+            old, _ = _gamut_table_order.popitem(last=False)
+            cached_gamut_tables.pop(old, None)
+        # entries dropped from cached_gamut_tables directly (e.g. clear()) shouldn't linger here
+        for old in [k for k in _gamut_table_order if k not in cached_gamut_tables and k != key]:
+            del _gamut_table_order[old]
+    return table
+
+def gamut_delta_e(
+    colors,
+    *,
+    cmyk_profile: str | None = None,
+    rgb_profile: str | None = None,
+    intent: int = ImageCms.Intent.RELATIVE_COLORIMETRIC,
+    black_point_compensation: bool = True,
+    workers: int | None = None,
+) -> np.ndarray:
+    """
+    Round-trip colors RGB->CMYK->RGB in batch and return each color's ΔE76
+    between the original and the round-tripped RGB, as an (N,) float32 array.
+    - colors: same inputs as `rgb_to_cmyk_batch`
+    - workers: threads used to round-trip new colors (default: one per CPU)
+    Large inputs (images) go through a per-settings 24-bit table (64 MB, see
+    `gamut_table_limit`): only colors never seen before hit the transforms, each
+    unique color once, so repeated proofing with the same profiles mostly becomes
+    a table lookup. The first check of an image costs time proportional to its
+    number of unique colors (a photo has far fewer than a noise pattern).
+    """
+    cmyk_profile, rgb_profile = _resolve_profiles(cmyk_profile, rgb_profile)
+    rgb = _as_color_array(colors, 3, _parse_rgb_string)
+    if rgb.shape[0] <= 1 << 16:
+        return _round_trip_delta_e(rgb, cmyk_profile, rgb_profile, intent, black_point_compensation)
+
+    key = (
+        _canonical_profile_key(cmyk_profile), _canonical_profile_key(rgb_profile),
+        int(intent), bool(black_point_compensation),
+    )
+    table = _gamut_table(key)
+    delta_e = table["delta_e"]
+
+    packed = (rgb[:, 0].astype(np.uint32) << 16) | (rgb[:, 1].astype(np.uint32) << 8) | rgb[:, 2]
+    values = delta_e[packed]
+    unknown = np.isnan(values)
+    if not unknown.any():
+        return values
+
+    with table["lock"]:
+        missing = packed[unknown]
+        seen = np.zeros(1 << 24, dtype=bool)
+        seen[missing] = True
+        uniq = np.flatnonzero(seen).astype(np.uint32)
+        del seen
+        uniq = uniq[np.isnan(delta_e[uniq])]  # another thread may have filled some meanwhile
+
+        def fill(start):
+            idx = uniq[start:start + gamut_chunk_size]
+            new = np.empty((idx.size, 3), dtype=np.uint8)
+            new[:, 0] = idx >> 16
+            new[:, 1] = (idx >> 8) & 0xFF
+            new[:, 2] = idx & 0xFF
+            delta_e[idx] = _round_trip_delta_e(new, cmyk_profile, rgb_profile, intent, black_point_compensation)
+
+        starts = range(0, uniq.size, gamut_chunk_size)
+        workers = min(len(starts), workers or os.cpu_count() or 1)
+        if workers <= 1:
+            for start in starts:
+                fill(start)
+        else:
+            with ThreadPoolExecutor(max_workers=workers) as pool:
+                # list() re-raises the first worker error, if any
+                list(pool.map(fill, starts))
+    values[unknown] = delta_e[missing]
+    return values
+
+def out_of_gamut_mask(colors, *, threshold: float = 2.0, **kwargs) -> np.ndarray:
+    """
+    Boolean (N,) mask, True where a color's RGB->CMYK->RGB round trip is off by more than
+    `threshold` ΔE76. Accepts the same keyword arguments as `gamut_delta_e`.
+    """
+    return gamut_delta_e(colors, **kwargs) > threshold
+
+def is_out_of_gamut(rgb_string, g=None, b=None, *, threshold: float = 2.0, **kwargs) -> bool:
+    """Single-color version of `out_of_gamut_mask`; takes the same color inputs as `rgb_to_cmyk`."""
+    if g is not None and b is not None:
+        rgb_string = (rgb_string, g, b)
+    return bool(out_of_gamut_mask([rgb_string], threshold=threshold, **kwargs)[0])
+
+def gamut_mask_image(img: Image.Image, *, threshold: float = 2.0, **kwargs) -> Image.Image:
+    """
+    Return an "L" mask image the size of `img`: 255 where the pixel is out of the
+    CMYK gamut (ΔE76 above `threshold` after a round trip), 0 elsewhere.
+    Accepts the same keyword arguments as `gamut_delta_e`.
+    """
+    if img.mode != "RGB":
+        img = img.convert("RGB")
+    rgb = np.asarray(img, dtype=np.uint8).reshape(-1, 3)
+    mask = out_of_gamut_mask(rgb, threshold=threshold, **kwargs)
+    return Image.fromarray((mask * np.uint8(255)).astype(np.uint8).reshape(img.size[1], img.size[0]), "L")
+
+
+# ---------- Multi-profile comparison ----------
+
+def compare_cmyk_profiles(
+    palette,
+    profiles: list | None = None,
+    *,
+    rgb_profile: str | None = None,
+    intent: int = ImageCms.Intent.RELATIVE_COLORIMETRIC,
+    black_point_compensation: bool = True,
+    percent: bool = True,
+    workers: int | None = None,
+) -> dict:
+    """
+    Separate one RGB palette under several CMYK profiles at once.
+    - palette: same inputs as `rgb_to_cmyk_batch`
+    - profiles: CMYK profile specifiers; defaults to every bundled CMYK profile
+    Transforms are warmed and batches converted concurrently on a thread pool
+    (LCMS releases the GIL while building and applying transforms).
+    Returns a dict:
+        - 'profiles': the profile specifiers, in row order
+        - 'colors':   the (N,3) uint8 RGB palette
+        - 'results':  a (P, N, 4) uint8 array of CMYK values, one row per profile
+                      (0..100 if percent, else 0..255)
+    """
+    if profiles is None:
+        profiles = [p["path"] for p in profile_registry.list("CMYK")]
+    profiles = list(profiles)
+    rgb = _as_color_array(palette, 3, _parse_rgb_string)
+    rgb_profile = rgb_profile or selected_rgb_profile
+    results = np.empty((len(profiles), rgb.shape[0], 4), dtype=np.uint8)
+
+    def convert(i):
+        results[i] = rgb_to_cmyk_batch(
+            rgb, cmyk_profile=profiles[i], rgb_profile=rgb_profile, intent=intent,
+            black_point_compensation=black_point_compensation, percent=percent,
+        )
+
+    with ThreadPoolExecutor(max_workers=workers or min(len(profiles), (os.cpu_count() or 1) + 4) or 1) as pool:
+        # list() re-raises the first worker error, if any
+        list(pool.map(convert, range(len(profiles))))
+
+    return {"profiles": profiles, "colors": rgb, "results": results}
 
 
 def shift_image_hue_rgba(img_rgba: Image.Image, hue_shift: int) -> Image.Image:
@@ -314,6 +1104,10 @@ def shift_image_hue_rgba(img_rgba: Image.Image, hue_shift: int) -> Image.Image:
 # print("ending")
 
 
+if os.environ.get("VOIDS_COLOR_WARMUP", "").strip().lower() in ("1", "true", "yes"):
+    start_color_warmup()
+
+
 def local_cmyk_to_rgb(c, m, y, k):  #self.cmyk_to_rgb  #self.cmyk_to_rgb
         """PLACEBO!!! USE 'utils.cmyk_to_rgb' FOR ACCURATE Convert CMYK to RGB"""
         c, m, y, k = c / 100, m / 100, y / 100, k / 100
@@ -326,54 +1120,6 @@ def local_cmyk_to_rgb(c, m, y, k):  #self.cmyk_to_rgb  #self.cmyk_to_rgb
 
 
 
-import time
-def measure_performance(func, *args, iterations=1, **kwargs):
-    """
-    Measures the execution time of a function.
-    
-    Args:
-        func: The function to measure
-        *args: Positional arguments to pass to the function
-        iterations: Number of times to run the function (default: 1)
-        **kwargs: Keyword arguments to pass to the function
-    
-    Returns:
-        A dictionary containing:
-            - 'result': The return value of the function
-            - 'total_time': Total execution time in seconds
-            - 'avg_time': Average execution time per iteration in seconds
-            - 'min_time': Minimum execution time in seconds
-            - 'max_time': Maximum execution time in seconds
-            - 'iterations': Number of iterations performed
-    
-    Usage:
-        def slow_function(x):
-            time.sleep(x)
-            return x * 2
-        
-        results = measure_performance(slow_function, 0.5, iterations=3)
-        print(f"Average time: {results['avg_time']:.4f}s")
-    """
-    times = []
-    result = None
-    
-    for _ in range(iterations):
-        start_time = time.perf_counter()
-        result = func(*args, **kwargs)
-        end_time = time.perf_counter()
-        times.append(end_time - start_time)
-    
-    total_time = sum(times)
-    
-    return {
-        'result': result,
-        'total_time': total_time,
-        'avg_time': total_time / iterations,
-        'min_time': min(times),
-        'max_time': max(times),
-        'iterations': iterations
-    }
-
 
 
 
@@ -0,0 +1,400 @@
+import os
+import struct
+import warnings
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+from PIL import Image, ImageCms
+
+from utils_extra_color_conversions import _resolve_profiles, _get_cached_transform, _open_icc
+
+
+# ---------- Whole-image conversion (ICC-managed) ----------
+
+def _image_modes(to_mode: str) -> tuple:
+    """Return (from_mode, to_mode) for a target of "CMYK" or "RGB"."""
+    to_mode = to_mode.upper()
+    if to_mode == "CMYK":
+        return "RGB", "CMYK"
+    if to_mode == "RGB":
+        return "CMYK", "RGB"
+    raise ValueError(f"Unsupported target mode: {to_mode!r} (expected 'RGB' or 'CMYK')")
+
+def _transform_args(to_mode, cmyk_profile, rgb_profile, intent, black_point_compensation) -> tuple:
+    """Picklable description of a transform: (from_profile, to_profile, from_mode, to_mode, intent, flags)."""
+    from_mode, to_mode = _image_modes(to_mode)
+    cmyk_profile, rgb_profile = _resolve_profiles(cmyk_profile, rgb_profile)
+    flags = ImageCms.Flags.BLACKPOINTCOMPENSATION if black_point_compensation else 0
+    if to_mode == "CMYK":
+        return rgb_profile, cmyk_profile, from_mode, to_mode, int(intent), int(flags)
+    return cmyk_profile, rgb_profile, from_mode, to_mode, int(intent), int(flags)
+
+
+# Per-worker state, set once by the pool initializer (transforms can't be pickled)
+_worker_xform = None
+_worker_modes = None
+
+def _init_worker(transform_args: tuple):
+    global _worker_xform, _worker_modes
+    from_profile, to_profile, from_mode, to_mode, intent, flags = transform_args
+    _worker_xform = _get_cached_transform(from_profile, to_profile, from_mode, to_mode, intent, flags)
+    _worker_modes = (from_mode, to_mode)
+
+def _convert_strip(job: tuple) -> bytes:
+    width, height, data = job
+    from_mode, _ = _worker_modes
+    strip = Image.frombytes(from_mode, (width, height), data)
+    return ImageCms.applyTransform(strip, _worker_xform).tobytes()
+
+
+class ParallelImageConverter:
+    """
+    Converts whole PIL images between RGB and CMYK on a pool of worker processes.
+    The image is cut into full-width strips, each worker applies its own warm
+    ICC transform (built once in the pool initializer), and the strips are
+    reassembled in order. Keep one converter around to reuse the warm pool:
+
+        with ParallelImageConverter("CMYK", cmyk_profile=...) as conv:
+            cmyk_img = conv.convert(rgb_img)
+    """
+    # Images smaller than this are converted in-process; the pool isn't worth it.
+    min_parallel_pixels = 1 << 20
+
+    def __init__(
+        self,
+        to_mode: str = "CMYK",
+        *,
+        cmyk_profile: str | None = None,
+        rgb_profile: str | None = None,
+        intent: int = ImageCms.Intent.RELATIVE_COLORIMETRIC,
+        black_point_compensation: bool = True,
+        workers: int | None = None,
+        strip_pixels: int = 1 << 20,
+    ):
+        self.transform_args = _transform_args(to_mode, cmyk_profile, rgb_profile, intent, black_point_compensation)
+        self.from_mode, self.to_mode = self.transform_args[2], self.transform_args[3]
+        self.workers = workers or os.cpu_count() or 1
+        self.strip_pixels = strip_pixels
+        # Strips submitted but not yet copied into the output; bounds memory on huge images
+        self.max_in_flight = 2 * self.workers
+        self._pool = None
+
+    def _get_pool(self) -> ProcessPoolExecutor:
+        if self._pool is None:
+            self._pool = ProcessPoolExecutor(
+                max_workers=self.workers, initializer=_init_worker, initargs=(self.transform_args,)
+            )
+        return self._pool
+
+    def convert(self, img: Image.Image) -> Image.Image:
+        """Convert `img` (converted to the source mode first if needed) and return a new image."""
+        if img.mode != self.from_mode:
+            img = img.convert(self.from_mode)
+        width, height = img.size
+
+        if self.workers <= 1 or width * height < self.min_parallel_pixels:
+            return ImageCms.applyTransform(img, _get_cached_transform(*self.transform_args))
+
+        # Source strips are serialized one at a time as they're submitted and pasted straight
+        # into the preallocated output image, with at most `max_in_flight` strips pickled or
+        # waiting to be copied back at any time. Peak memory is the source and output images
+        # plus those strips.
+        rows = max(1, self.strip_pixels // max(width, 1))
+        out = Image.new(self.to_mode, (width, height))
+        pool = self._get_pool()
+        pending = deque()
+
+        def collect():
+            top, n, future = pending.popleft()
+            out.paste(Image.frombytes(self.to_mode, (width, n), future.result()), (0, top))
+
+        for top in range(0, height, rows):
+            n = min(rows, height - top)
+            if len(pending) >= self.max_in_flight:
+                collect()
+            data = img.crop((0, top, width, top + n)).tobytes()
+            pending.append((top, n, pool.submit(_convert_strip, (width, n, data))))
+            del data
+        while pending:
+            collect()
+        return out
+
+    def close(self):
+        if self._pool is not None:
+            self._pool.shutdown()
+            self._pool = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def convert_image_parallel(
+    img: Image.Image,
+    to_mode: str = "CMYK",
+    *,
+    cmyk_profile: str | None = None,
+    rgb_profile: str | None = None,
+    intent: int = ImageCms.Intent.RELATIVE_COLORIMETRIC,
+    black_point_compensation: bool = True,
+    workers: int | None = None,
+) -> Image.Image:
+    """
+    One-off parallel conversion of a whole image to "CMYK" or "RGB".
+    Starts and stops a pool; use ParallelImageConverter directly for repeated calls.
+    """
+    with ParallelImageConverter(
+        to_mode, cmyk_profile=cmyk_profile, rgb_profile=rgb_profile, intent=intent,
+        black_point_compensation=black_point_compensation, workers=workers,
+    ) as converter:
+        return converter.convert(img)
+
+
+# ---------- Streaming (bounded-memory) conversion ----------
+
+_BYTES_PER_PIXEL = {"L": 1, "RGB": 3, "RGBA": 4, "RGBX": 4, "CMYK": 4}
+
+def _raw_row_ranges(im: Image.Image):
+    """
+    If every tile of a lazily opened image is uncompressed, full-width and
+    top-down (uncompressed TIFF strips, PPM, ...), return a list of
+    (first_row, row_count, file_offset) ranges that can be read straight from
+    the file. Otherwise return None.
+    """
+    bpp = _BYTES_PER_PIXEL.get(im.mode)
+    if bpp is None or not im.tile:
+        return None
+    width = im.size[0]
+    ranges = []
+    for tile in im.tile:
+        codec, extents, offset, args = tile
+        rawmode, stride, ystep = (args, 0, 1) if isinstance(args, str) else (tuple(args) + (0, 1))[:3]
+        x0, y0, x1, y1 = extents
+        if codec != "raw" or rawmode != im.mode or ystep != 1 or stride not in (0, width * bpp):
+            return None
+        if x0 != 0 or x1 != width:
+            return None
+        ranges.append((y0, y1 - y0, offset))
+    ranges.sort()
+    # The ranges must tile the image top to bottom without gaps or overlaps
+    expected = 0
+    for first, count, _ in ranges:
+        if first != expected:
+            return None
+        expected += count
+    return ranges if expected == im.size[1] else None
+
+def iter_image_strips(path: str, rows: int = 256, *, strict: bool = False):
+    """
+    Yield (top, strip) pairs covering the image at `path`, `rows` rows at a time.
+    Uncompressed, top-down files are read strip by strip straight from disk,
+    so memory stays bounded by the strip size. Other formats (compressed TIFF,
+    PNG, JPEG, ...) can't be decoded partially by PIL and are loaded once, then sliced;
+    that fallback emits a warning, or raises ValueError if strict=True.
+    """
+    with Image.open(path) as im:
+        width, height = im.size
+        mode = im.mode
+        ranges = _raw_row_ranges(im)
+        if ranges is None:
+            message = (
+                f"{path} ({im.format}, {mode}, compression {im.info.get('compression', 'n/a')}) can't be "
+                f"read strip by strip; the whole {width}x{height} image is loaded into memory"
+            )
+            if strict:
+                raise ValueError(message)
+            warnings.warn(message, stacklevel=2)
+            im.load()
+            for top in range(0, height, rows):
+                yield top, im.crop((0, top, width, min(top + rows, height)))
+            return
+
+    # Source strips rarely line up with `rows`, so rows are gathered across their
+    # boundaries: every yielded strip has exactly `rows` rows except the last.
+    row_bytes = width * _BYTES_PER_PIXEL[mode]
+    strip_bytes = rows * row_bytes
+    buf = bytearray()
+    top = 0
+    with open(path, "rb") as f:
+        for _, count, offset in ranges:
+            f.seek(offset)
+            remaining = count * row_bytes
+            while remaining:
+                chunk = f.read(min(remaining, strip_bytes - len(buf)))
+                if not chunk:
+                    raise ValueError(f"Unexpected end of file in {path}")
+                buf += chunk
+                remaining -= len(chunk)
+                if len(buf) == strip_bytes:
+                    yield top, Image.frombytes(mode, (width, rows), bytes(buf))
+                    top += rows
+                    buf.clear()
+    if buf:
+        yield top, Image.frombytes(mode, (width, len(buf) // row_bytes), bytes(buf))
+
+
+class StripTiffWriter:
+    """
+    Writes an uncompressed 8-bit RGB/CMYK TIFF one strip at a time, so the full
+    image never has to exist in memory. Switches to BigTIFF automatically when
+    the pixel data would not fit 32-bit offsets. Optionally embeds an ICC profile.
+    """
+    _PHOTOMETRIC = {"RGB": 2, "CMYK": 5}
+
+    def __init__(self, path: str, mode: str, size: tuple, icc_profile: bytes | None = None, bigtiff: bool | None = None):
+        if mode not in self._PHOTOMETRIC:
+            raise ValueError(f"Unsupported TIFF mode: {mode!r} (expected 'RGB' or 'CMYK')")
+        self.mode = mode
+        self.width, self.height = size
+        self.icc_profile = icc_profile
+        self.samples = len(mode)
+        if bigtiff is None:
+            bigtiff = self.width * self.height * self.samples + len(icc_profile or b"") > 0xFFFF0000
+        self.big = bigtiff
+        self._offsets = []
+        self._counts = []
+        self._rows_per_strip = None
+        self._rows_written = 0
+        self.path = path
+        self._f = open(path, "wb")
+        # Header; IFD offset is patched in close()
+        if self.big:
+            self._f.write(b"II" + struct.pack("<HHHQ", 43, 8, 0, 0))
+        else:
+            self._f.write(b"II" + struct.pack("<HI", 42, 0))
+
+    def write_strip(self, strip: Image.Image):
+        if strip.mode != self.mode or strip.size[0] != self.width:
+            raise ValueError(f"Strip must be {self.mode} and {self.width} pixels wide")
+        rows = strip.size[1]
+        if self._rows_per_strip is None:
+            self._rows_per_strip = rows
+        elif rows > self._rows_per_strip or (self._counts and self._counts[-1] // (self.width * self.samples) < self._rows_per_strip):
+            raise ValueError("Only the last strip may be shorter than the first one")
+        self._offsets.append(self._f.tell())
+        data = strip.tobytes()
+        self._f.write(data)
+        self._counts.append(len(data))
+        self._rows_written += rows
+
+    def close(self):
+        if self._f.closed:
+            return
+        if self._rows_written != self.height:
+            self._f.close()
+            raise ValueError(f"Wrote {self._rows_written} rows, expected {self.height}")
+        f = self._f
+        big = self.big
+        long_type, long_size = (16, 8) if big else (4, 4)  # LONG8 / LONG
+        inline = 8 if big else 4
+        entry_fmt = "<HHQ" if big else "<HHI"
+
+        # Out-of-line values first, then the IFD pointing at them
+        def put(data: bytes) -> int:
+            if f.tell() % 2:
+                f.write(b"\0")
+            pos = f.tell()
+            f.write(data)
+            return pos
+
+        offs_fmt = "Q" if big else "I"
+        tags = [
+            (256, 4, 1, struct.pack("<I", self.width)),
+            (257, 4, 1, struct.pack("<I", self.height)),
+            (258, 3, self.samples, struct.pack(f"<{self.samples}H", *([8] * self.samples))),
+            (259, 3, 1, struct.pack("<H", 1)),
+            (262, 3, 1, struct.pack("<H", self._PHOTOMETRIC[self.mode])),
+            (273, long_type, len(self._offsets), struct.pack(f"<{len(self._offsets)}{offs_fmt}", *self._offsets)),
+            (277, 3, 1, struct.pack("<H", self.samples)),
+            (278, 4, 1, struct.pack("<I", self._rows_per_strip or self.height)),
+            (279, long_type, len(self._counts), struct.pack(f"<{len(self._counts)}{offs_fmt}", *self._counts)),
+            (284, 3, 1, struct.pack("<H", 1)),
+        ]
+        if self.icc_profile:
+            tags.append((34675, 7, len(self.icc_profile), self.icc_profile))
+
+        entries = []
+        for tag, typ, count, data in tags:
+            if len(data) <= inline:
+                value = data.ljust(inline, b"\0")
+            else:
+                value = struct.pack("<Q" if big else "<I", put(data))
+            entries.append(struct.pack(entry_fmt, tag, typ, count) + value)
+
+        if f.tell() % 2:
+            f.write(b"\0")
+        ifd_offset = f.tell()
+        f.write(struct.pack("<Q" if big else "<H", len(entries)))
+        f.write(b"".join(entries))
+        f.write(b"\0" * long_size)  # no next IFD
+        f.seek(8 if big else 4)
+        f.write(struct.pack("<Q" if big else "<I", ifd_offset))
+        f.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, *exc):
+        try:
+            if exc_type is None:
+                self.close()
+                return
+        except Exception:
+            self._discard()
+            raise
+        self._discard()
+
+    def _discard(self):
+        """Close and delete a partially written file."""
+        self._f.close()
+        try:
+            os.remove(self.path)
+        except OSError:
+            pass
+
+
+def convert_image_streaming(
+    src_path: str,
+    dst_path: str,
+    to_mode: str = "CMYK",
+    *,
+    cmyk_profile: str | None = None,
+    rgb_profile: str | None = None,
+    intent: int = ImageCms.Intent.RELATIVE_COLORIMETRIC,
+    black_point_compensation: bool = True,
+    strip_rows: int = 256,
+    embed_profile: bool = True,
+    strict: bool = False,
+) -> str:
+    """
+    Convert the image at `src_path` to "CMYK" or "RGB" and write an uncompressed
+    TIFF to `dst_path`, one strip at a time. The destination profile is embedded
+    unless embed_profile=False. Returns dst_path.
+
+    Peak memory is about one strip of input plus one strip of output only when the
+    source is uncompressed and stored top-down (uncompressed TIFF, PPM, ...).
+    Compressed sources (LZW/ZIP/JPEG TIFFs, PNG, JPEG) can't be decoded partially by
+    PIL, so the whole source image is loaded first and only the output is streamed.
+    That fallback emits a warning; pass strict=True to raise ValueError instead.
+    """
+    transform_args = _transform_args(to_mode, cmyk_profile, rgb_profile, intent, black_point_compensation)
+    from_mode, to_mode = transform_args[2], transform_args[3]
+    xform = _get_cached_transform(*transform_args)
+
+    icc = None
+    if embed_profile:
+        profile = _open_icc(transform_args[1])
+        if not isinstance(profile, ImageCms.ImageCmsProfile):
+            profile = ImageCms.ImageCmsProfile(profile)
+        icc = profile.tobytes()
+
+    with Image.open(src_path) as im:
+        size = im.size
+    with StripTiffWriter(dst_path, to_mode, size, icc_profile=icc) as writer:
+        for _, strip in iter_image_strips(src_path, strip_rows, strict=strict):
+            if strip.mode != from_mode:
+                strip = strip.convert(from_mode)
+            writer.write_strip(ImageCms.applyTransform(strip, xform))
+    return dst_path
@@ -0,0 +1,453 @@
+import os
+from pathlib import Path
+
+import numpy as np
+from PIL import ImageCms
+
+import utils_extra_color_conversions as _conv
+from utils_extra_color_conversions import (
+    _resolve_profiles,
+    rgb_to_cmyk_batch, cmyk_to_rgb_batch, _as_color_array, _parse_rgb_string, _parse_cmyk_string,
+    _lab_from_batch, delta_e_76, _canonical_profile_key, _to_pct_from_255, _to_255_from_pct,
+)
+
+
+# Where persistent tables are written. Override with the VOIDS_COLOR_CACHE environment variable.
+table_cache_dir = Path(os.environ.get("VOIDS_COLOR_CACHE", Path.home() / ".cache" / "voids_color_tables"))
+
+
+# ---------- Persistent LUT cache ----------
+
+class LUTDiskCache:
+    """
+    Disk-backed store for sampled LUT data, so new processes memory-map tables
+    instead of re-sampling the ICC transform.
+    - Entries are .npy files named after (direction, profile content hashes, intent,
+      flags, grid size). Editing a profile changes its hash, so stale entries are
+      never matched again; they simply age out.
+    - Total size is capped at `max_bytes`; the least recently used entries
+      (by file modification time, refreshed on every load) are evicted first.
+    """
+    def __init__(self, directory: str | Path | None = None, max_bytes: int = 256 << 20, enabled: bool = True):
+        self.directory = Path(directory) if directory else table_cache_dir / "luts"
+        self.max_bytes = max_bytes
+        self.enabled = enabled
+
+    def path(self, name: str) -> Path:
+        return self.directory / f"{name}.npy"
+
+    def load(self, name: str) -> np.ndarray | None:
+        """Memory-map a stored entry (read-only), or return None if it isn't cached."""
+        if not self.enabled:
+            return None
+        path = self.path(name)
+        try:
+            arr = np.load(path, mmap_mode="r")
+        except (OSError, ValueError):
+            return None
+        try:
+            os.utime(path)  # mark as recently used
+        except OSError:
+            pass  # shared/read-only cache owned by someone else: the entry is still good
+        return arr
+
+    def store(self, name: str, arr: np.ndarray):
+        """Write an entry atomically, then evict old entries until the cache fits `max_bytes`."""
+        if not self.enabled:
+            return
+        path = self.path(name)
+        tmp = path.with_name(f"{path.stem}.{os.getpid()}.tmp.npy")
+        try:
+            self.directory.mkdir(parents=True, exist_ok=True)
+            np.save(tmp, arr)
+            os.replace(tmp, path)
+        except OSError:
+            return  # an unwritable, read-only or full cache location shouldn't break conversions
+        finally:
+            try:
+                tmp.unlink(missing_ok=True)
+            except OSError:
+                pass
+        self.evict()
+
+    def evict(self):
+        """Drop least recently used entries until the total size is within `max_bytes`."""
+        entries = []
+        for p in self.directory.glob("*.npy"):
+            try:
+                st = p.stat()
+            except OSError:
+                continue
+            entries.append((st.st_mtime, st.st_size, p))
+        total = sum(size for _, size, _ in entries)
+        for _, size, p in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            try:
+                p.unlink()
+                total -= size
+            except OSError:
+                pass
+
+    def clear(self):
+        for p in self.directory.glob("*.npy"):
+            p.unlink(missing_ok=True)
+
+lut_disk_cache = LUTDiskCache()
+
+
+# ---------- Grid lookup tables (simplex interpolation) ----------
+
+def _grid_points(grid_size: int, dims: int) -> np.ndarray:
+    """All grid_size**dims device-value grid nodes as an (N, dims) uint8 array, last axis fastest."""
+    axis = np.rint(np.linspace(0.0, 255.0, grid_size)).astype(np.uint8)
+    mesh = np.meshgrid(*([axis] * dims), indexing="ij")
+    return np.stack(mesh, axis=-1).reshape(-1, dims)
+
+class _GridLUT:
+    """
+    Shared machinery for the RGB->CMYK (3D) and CMYK->RGB (4D) tables.
+    The transform is sampled once on a regular grid; lookups use simplex
+    interpolation (tetrahedral in 3D, 5-vertex simplices in 4D), which only
+    blends dims+1 table rows per color instead of 2**dims.
+    """
+    in_mode = ""
+    out_mode = ""
+
+    def __init__(
+        self,
+        grid_size: int,
+        *,
+        cmyk_profile: str | None = None,
+        rgb_profile: str | None = None,
+        intent: int = ImageCms.Intent.RELATIVE_COLORIMETRIC,
+        black_point_compensation: bool = True,
+    ):
+        if grid_size < 2:
+            raise ValueError(f"grid_size must be at least 2, got {grid_size}")
+        self.grid_size = n = int(grid_size)
+        self.cmyk_profile, self.rgb_profile = _resolve_profiles(cmyk_profile, rgb_profile)
+        self.intent = intent
+        self.black_point_compensation = black_point_compensation
+
+        dims = len(self.in_mode)
+        # Flat (n**dims, out) table, row index = sum(i_d * n**(dims-1-d)).
+        # Reuse a table sampled by an earlier process when one is on disk.
+        flags = ImageCms.Flags.BLACKPOINTCOMPENSATION if black_point_compensation else 0
+        in_profile, out_profile = (
+            (self.rgb_profile, self.cmyk_profile) if self.in_mode == "RGB" else (self.cmyk_profile, self.rgb_profile)
+        )
+        cache_name = (
+            f"{self.in_mode}2{self.out_mode}_{_canonical_profile_key(in_profile)}_{_canonical_profile_key(out_profile)}"
+            f"_i{int(intent)}_f{int(flags)}_g{n}"
+        ).lower()
+        self.table = lut_disk_cache.load(cache_name)
+        if self.table is None or self.table.shape != (n ** dims, len(self.out_mode)):
+            self.table = self._exact(_grid_points(n, dims)).astype(np.float32)
+            lut_disk_cache.store(cache_name, self.table)
+        self._strides = np.array([n ** (dims - 1 - d) for d in range(dims)], dtype=np.intp)
+        self._scale = (n - 1) / 255.0
+        self._rows = None  # Plain Python copy of the table for the scalar path
+
+    def _exact(self, arr: np.ndarray) -> np.ndarray:
+        raise NotImplementedError
+
+    def lookup(self, colors) -> np.ndarray:
+        """
+        Interpolate many colors at once.
+        - colors: same inputs as the matching `*_batch` function
+        Returns an (N, out channels) uint8 array of 0..255 values.
+        """
+        arr = _as_color_array(colors, len(self.in_mode), self._parse)
+        return np.clip(np.rint(self._interpolate(arr)), 0, 255).astype(np.uint8)
+
+    def _interpolate(self, arr: np.ndarray) -> np.ndarray:
+        n = self.grid_size
+        x = arr.astype(np.float32) * self._scale
+        base = np.minimum(x.astype(np.intp), n - 2)
+        f = x - base
+
+        # Walk from the base corner towards the opposite corner, one axis at a
+        # time in order of decreasing fraction; that path picks the simplex.
+        order = np.argsort(-f, axis=1)
+        fs = np.take_along_axis(f, order, axis=1)
+        steps = self._strides[order]
+        idx = base @ self._strides
+
+        t = self.table
+        out = (1.0 - fs[:, 0])[:, None] * t[idx]
+        dims = fs.shape[1]
+        for d in range(dims):
+            idx = idx + steps[:, d]
+            w = fs[:, d] - fs[:, d + 1] if d + 1 < dims else fs[:, d]
+            out += w[:, None] * t[idx]
+        return out
+
+    def convert(self, *values: int) -> tuple:
+        """Interpolate a single color given as 0..255 device values, in plain Python (no NumPy call overhead)."""
+        if self._rows is None:
+            self._rows = self.table.tolist()
+        n = self.grid_size
+        scale = self._scale
+        idx = 0
+        fracs = []
+        for v, stride in zip(values, self._strides.tolist()):
+            x = v * scale
+            i = int(x)
+            if i > n - 2:
+                i = n - 2
+            idx += i * stride
+            fracs.append((x - i, stride))
+        fracs.sort(reverse=True)
+
+        rows = self._rows
+        prev = 1.0
+        acc = None
+        for frac, stride in fracs:
+            row = rows[idx]
+            w = prev - frac
+            acc = [w * v for v in row] if acc is None else [a + w * v for a, v in zip(acc, row)]
+            idx += stride
+            prev = frac
+        acc = [a + prev * v for a, v in zip(acc, rows[idx])]
+        return tuple(0 if v < 0 else 255 if v > 255 else int(round(v)) for v in acc)
+
+    def accuracy(self, samples: int = 20000, seed: int = 0) -> dict:
+        """
+        Compare the LUT against the exact ICC transform.
+        Both results are taken to L*a*b* through the output profile and compared with ΔE76.
+        Returns a dict with 'grid_size', 'samples', 'max_delta_e' and 'mean_delta_e'.
+        """
+        rng = np.random.default_rng(seed)
+        arr = rng.integers(0, 256, size=(samples, len(self.in_mode)), dtype=np.uint8)
+        flags = ImageCms.Flags.BLACKPOINTCOMPENSATION if self.black_point_compensation else 0
+        out_profile = self.cmyk_profile if self.out_mode == "CMYK" else self.rgb_profile
+        lab_exact = _lab_from_batch(self._exact(arr), out_profile, self.out_mode, self.intent, flags)
+        lab_approx = _lab_from_batch(self.lookup(arr), out_profile, self.out_mode, self.intent, flags)
+        de = delta_e_76(lab_exact, lab_approx)
+        return {
+            "grid_size": self.grid_size,
+            "samples": samples,
+            "max_delta_e": float(de.max()),
+            "mean_delta_e": float(de.mean()),
+        }
+
+class RGBtoCMYKLUT(_GridLUT):
+    """
+    Samples the RGB->CMYK ICC transform once on a grid_size³ grid, then answers
+    conversions with tetrahedral interpolation instead of calling LCMS per color.
+    Grid sizes of 17/33/65 trade build time & memory for accuracy (see `accuracy()`).
+    """
+    in_mode = "RGB"
+    out_mode = "CMYK"
+    _parse = staticmethod(_parse_rgb_string)
+
+    def __init__(self, grid_size: int = 33, **kwargs):
+        super().__init__(grid_size, **kwargs)
+
+    def _exact(self, arr):
+        return rgb_to_cmyk_batch(
+            arr, cmyk_profile=self.cmyk_profile, rgb_profile=self.rgb_profile,
+            intent=self.intent, black_point_compensation=self.black_point_compensation,
+        )
+
+    def rgb_to_cmyk(self, r8: int, g8: int, b8: int) -> tuple:
+        """Drop-in for `utils.rgb_to_cmyk(r, g, b)`: returns CMYK as 0..100 percentages."""
+        return tuple(_to_pct_from_255(v) for v in self.convert(r8, g8, b8))
+
+class CMYKtoRGBLUT(_GridLUT):
+    """
+    Samples the CMYK->RGB ICC transform once on a grid_size⁴ grid and answers
+    conversions with 4D simplex interpolation. 17⁴ is ~84k samples, 33⁴ ~1.2M.
+    """
+    in_mode = "CMYK"
+    out_mode = "RGB"
+    _parse = staticmethod(_parse_cmyk_string)
+
+    def __init__(self, grid_size: int = 17, **kwargs):
+        super().__init__(grid_size, **kwargs)
+
+    def _exact(self, arr):
+        return cmyk_to_rgb_batch(
+            arr, cmyk_profile=self.cmyk_profile, rgb_profile=self.rgb_profile,
+            intent=self.intent, black_point_compensation=self.black_point_compensation,
+        )
+
+    def cmyk_to_rgb(self, c: float, m: float, y: float, k: float) -> tuple:
+        """Drop-in for `utils.cmyk_to_rgb(c, m, y, k)`: takes CMYK as 0..100 percentages."""
+        return self.convert(_to_255_from_pct(c), _to_255_from_pct(m), _to_255_from_pct(y), _to_255_from_pct(k))
+
+
+# Cache for built LUTs (direction, rgb profile, cmyk profile, intent, bpc, grid_size) -> LUT
+cached_luts = _conv.BuildCache()
+
+def _get_cached_lut(cls, grid_size, cmyk_profile, rgb_profile, intent, black_point_compensation):
+    cmyk_profile, rgb_profile = _resolve_profiles(cmyk_profile, rgb_profile)
+    key = (
+        f"{cls.in_mode}->{cls.out_mode}",
+        _canonical_profile_key(rgb_profile),
+        _canonical_profile_key(cmyk_profile),
+        int(intent),
+        bool(black_point_compensation),
+        int(grid_size),
+    )
+    return cached_luts.get_or_build(key, lambda: cls(
+        grid_size, cmyk_profile=cmyk_profile, rgb_profile=rgb_profile,
+        intent=intent, black_point_compensation=black_point_compensation,
+    ))
+
+def get_rgb_to_cmyk_lut(
+    grid_size: int = 33,
+    *,
+    cmyk_profile: str | None = None,
+    rgb_profile: str | None = None,
+    intent: int = ImageCms.Intent.RELATIVE_COLORIMETRIC,
+    black_point_compensation: bool = True,
+) -> RGBtoCMYKLUT:
+    """Return a cached RGBtoCMYKLUT for the given settings or build & cache one."""
+    return _get_cached_lut(RGBtoCMYKLUT, grid_size, cmyk_profile, rgb_profile, intent, black_point_compensation)
+
+def get_cmyk_to_rgb_lut(
+    grid_size: int = 17,
+    *,
+    cmyk_profile: str | None = None,
+    rgb_profile: str | None = None,
+    intent: int = ImageCms.Intent.RELATIVE_COLORIMETRIC,
+    black_point_compensation: bool = True,
+) -> CMYKtoRGBLUT:
+    """
+    Return a cached CMYKtoRGBLUT for the given settings or build & cache one.
+    Tables are keyed by profile pair, intent and BPC, so switching back to a
+    previously used CMYK profile reuses its table.
+    """
+    return _get_cached_lut(CMYKtoRGBLUT, grid_size, cmyk_profile, rgb_profile, intent, black_point_compensation)
+
+def cmyk_to_rgb_lut(
+    cmyk_string,
+    m: int | float | None = None,
+    y: int | float | None = None,
+    k: int | float | None = None,
+    *,
+    grid_size: int = 17,
+    cmyk_profile: str | None = None,
+    rgb_profile: str | None = None,
+    intent: int = ImageCms.Intent.RELATIVE_COLORIMETRIC,
+    black_point_compensation: bool = True,
+):
+    """
+    LUT-backed `cmyk_to_rgb`: same inputs, returns an (r, g, b) tuple.
+    Passing an (N,4) uint8 array instead returns an (N,3) uint8 array.
+    """
+    lut = get_cmyk_to_rgb_lut(
+        grid_size, cmyk_profile=cmyk_profile, rgb_profile=rgb_profile,
+        intent=intent, black_point_compensation=black_point_compensation,
+    )
+    if isinstance(cmyk_string, np.ndarray):
+        return lut.lookup(cmyk_string)
+    cmyk_string = (cmyk_string, m, y, k) if (m is not None and y is not None and k is not None) else cmyk_string
+    return lut.convert(*_parse_cmyk_string(cmyk_string))
+
+
+# ---------- Exhaustive 24-bit RGB -> CMYK table (memory-mapped) ----------
+
+class ExactRGBtoCMYKTable:
+    """
+    Every one of the 16.7M RGB colors converted once and stored as a 64 MB file
+    of CMYK bytes, indexed by (r << 16) | (g << 8) | b. The file is opened with
+    mmap, so lookups are exact, O(1), need no warm-up, and the pages are shared
+    between every process that opens the same table.
+    Use `ExactRGBtoCMYKTable.open(...)` to build-or-load.
+    """
+    entries = 1 << 24
+    build_chunk = 1 << 20  # colors per transform call while building
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        if self.path.stat().st_size != self.entries * 4:
+            raise ValueError(f"Corrupt RGB->CMYK table (unexpected size): {str(self.path)}")
+        self.table = np.memmap(self.path, dtype=np.uint8, mode="r", shape=(self.entries, 4))
+
+    @staticmethod
+    def table_path(
+        cmyk_profile: str | None = None,
+        rgb_profile: str | None = None,
+        intent: int = ImageCms.Intent.RELATIVE_COLORIMETRIC,
+        black_point_compensation: bool = True,
+        cache_dir: str | Path | None = None,
+    ) -> Path:
+        """File the table for these settings lives in (keyed by profile content hash, intent & flags)."""
+        cmyk_profile, rgb_profile = _resolve_profiles(cmyk_profile, rgb_profile)
+        flags = ImageCms.Flags.BLACKPOINTCOMPENSATION if black_point_compensation else 0
+        name = (
+            f"rgb2cmyk_{_canonical_profile_key(rgb_profile)}_{_canonical_profile_key(cmyk_profile)}"
+            f"_i{int(intent)}_f{int(flags)}.u8"
+        )
+        return Path(cache_dir or table_cache_dir) / name
+
+    @classmethod
+    def build(
+        cls,
+        path: str | Path,
+        *,
+        cmyk_profile: str | None = None,
+        rgb_profile: str | None = None,
+        intent: int = ImageCms.Intent.RELATIVE_COLORIMETRIC,
+        black_point_compensation: bool = True,
+    ) -> Path:
+        """Convert all 2**24 colors in batches and write them to `path` (atomically, via a temp file)."""
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+        try:
+            with open(tmp, "wb") as f:
+                for start in range(0, cls.entries, cls.build_chunk):
+                    idx = np.arange(start, start + cls.build_chunk, dtype=np.uint32)
+                    rgb = np.empty((idx.size, 3), dtype=np.uint8)
+                    rgb[:, 0] = idx >> 16
+                    rgb[:, 1] = (idx >> 8) & 0xFF
+                    rgb[:, 2] = idx & 0xFF
+                    cmyk = rgb_to_cmyk_batch(
+                        rgb, cmyk_profile=cmyk_profile, rgb_profile=rgb_profile,
+                        intent=intent, black_point_compensation=black_point_compensation,
+                    )
+                    f.write(cmyk.tobytes())
+            os.replace(tmp, path)
+        finally:
+            if tmp.exists():
+                tmp.unlink()
+        return path
+
+    @classmethod
+    def open(
+        cls,
+        *,
+        cmyk_profile: str | None = None,
+        rgb_profile: str | None = None,
+        intent: int = ImageCms.Intent.RELATIVE_COLORIMETRIC,
+        black_point_compensation: bool = True,
+        cache_dir: str | Path | None = None,
+        build: bool = True,
+    ) -> "ExactRGBtoCMYKTable":
+        """Map the table for these settings, building it first if it does not exist yet (unless build=False)."""
+        path = cls.table_path(cmyk_profile, rgb_profile, intent, black_point_compensation, cache_dir)
+        if not path.is_file():
+            if not build:
+                raise FileNotFoundError(f"No RGB->CMYK table built yet: {str(path)}")
+            cls.build(
+                path, cmyk_profile=cmyk_profile, rgb_profile=rgb_profile,
+                intent=intent, black_point_compensation=black_point_compensation,
+            )
+        return cls(path)
+
+    def lookup(self, colors) -> np.ndarray:
+        """Exact CMYK 0..255 values for many colors (same inputs as `rgb_to_cmyk_batch`). Returns (N,4) uint8."""
+        rgb = _as_color_array(colors, 3, _parse_rgb_string).astype(np.uint32)
+        return np.asarray(self.table[(rgb[:, 0] << 16) | (rgb[:, 1] << 8) | rgb[:, 2]])
+
+    def convert(self, r8: int, g8: int, b8: int) -> tuple:
+        """Exact CMYK 0..255 values for a single color."""
+        return tuple(self.table[(r8 << 16) | (g8 << 8) | b8].tolist())
+
+    def rgb_to_cmyk(self, r8: int, g8: int, b8: int) -> tuple:
+        """Drop-in for `utils.rgb_to_cmyk(r, g, b)`: returns CMYK as 0..100 percentages."""
+        return tuple(_to_pct_from_255(v) for v in self.convert(r8, g8, b8))
@@ -0,0 +1,367 @@
+import io
+import csv
+import json
+import struct
+from itertools import islice
+from pathlib import Path
+
+import numpy as np
+from PIL import ImageCms
+
+from utils_extra_color_conversions import (
+    _resolve_profiles, _clamp8, _parse_rgb_string, _parse_cmyk_string,
+    rgb_to_cmyk_batch, cmyk_to_rgb_batch,
+)
+
+
+# Swatches travel through the pipeline as (name, model, values):
+# model is "RGB" or "CMYK" and values are device 0..255 ints, as returned by the parsers.
+palette_formats = ("csv", "json", "gpl", "ase")
+
+
+def _palette_format(path, fmt: str | None) -> str:
+    fmt = (fmt or Path(path).suffix.lstrip(".")).lower()
+    if fmt not in palette_formats:
+        raise ValueError(f"Unsupported palette format: {fmt!r} (expected one of {', '.join(palette_formats)})")
+    return fmt
+
+def _parse_any(value: str) -> tuple:
+    """Parse a color string as RGB (hex, rgb(...), 3 numbers), or as CMYK (cmyk(...), 4 numbers)."""
+    if value.lstrip().startswith("#"):
+        # #RGB, #RRGGBB and #RRGGBBAA (alpha dropped); imported here since utils loads this module lazily
+        import utils
+        return "RGB", tuple(utils.hex_to_rgb(value.strip())[:3])
+    if not value.lstrip().lower().startswith("cmyk"):
+        try:
+            return "RGB", _parse_rgb_string(value)
+        except ValueError:
+            pass
+    return "CMYK", _parse_cmyk_string(value)
+
+
+# ---------- Readers (generators, one swatch at a time) ----------
+
+def _read_csv(f, errors: list):
+    """
+    Columns (case-insensitive): name plus one of
+    r,g,b (0..255) | c,m,y,k (percent) | hex | color (any string the parsers accept).
+    """
+    reader = csv.DictReader(f)
+    if reader.fieldnames is None:
+        return
+    fields = {name.strip().lower(): name for name in reader.fieldnames}
+    col = lambda key: fields.get(key)
+    name_col = col("name")
+    rgb_cols = [col(k) for k in "rgb"] if all(col(k) for k in "rgb") else None
+    cmyk_cols = [col(k) for k in "cmyk"] if all(col(k) for k in "cmyk") else None
+    text_col = col("hex") or col("color")
+
+    for index, row in enumerate(reader, 1):
+        name = (row.get(name_col) or "").strip() if name_col else ""
+        try:
+            if cmyk_cols and all(row.get(c) not in (None, "") for c in cmyk_cols):
+                yield name, "CMYK", _parse_cmyk_string(tuple(float(row[c]) for c in cmyk_cols))
+            elif rgb_cols and all(row.get(c) not in (None, "") for c in rgb_cols):
+                yield name, "RGB", tuple(_clamp8(round(float(row[c]))) for c in rgb_cols)
+            elif text_col and row.get(text_col):
+                yield (name, *_parse_any(row[text_col]))
+            else:
+                raise ValueError("no color columns")
+        except (ValueError, TypeError) as e:
+            errors.append((index, name, str(e)))
+
+def _iter_json_array(f, read_size: int = 1 << 16):
+    """Yield the items of a top-level JSON array one by one without loading the whole file."""
+    decoder = json.JSONDecoder()
+    buf, pos, eof = "", 0, False
+
+    def refill():
+        nonlocal buf, pos, eof
+        more = f.read(read_size)
+        eof = not more
+        buf, pos = buf[pos:] + more, 0
+
+    def skip(chars):
+        nonlocal pos
+        while True:
+            while pos < len(buf) and buf[pos] in chars:
+                pos += 1
+            if pos < len(buf) or eof:
+                return
+            refill()
+
+    skip(" \t\r\n")
+    if pos >= len(buf) or buf[pos] != "[":
+        # Not an array: {"swatches": [...]} / {"colors": [...]} are loaded whole
+        data = json.loads(buf[pos:] + f.read())
+        yield from (data.get("swatches") or data.get("colors") or []) if isinstance(data, dict) else []
+        return
+    pos += 1
+    while True:
+        skip(" \t\r\n,")
+        if pos >= len(buf) or buf[pos] == "]":
+            return
+        while True:
+            try:
+                item, end = decoder.raw_decode(buf, pos)
+                if end < len(buf) or eof:
+                    break
+                # touches the end of the buffer: it may continue in the next read
+            except json.JSONDecodeError:
+                if eof:
+                    raise
+            refill()
+        pos = end
+        yield item
+
+def _read_json(f, errors: list):
+    """
+    A JSON array of {"name": ..., and one of "rgb": [r,g,b] | "cmyk": [c,m,y,k] (percent) | "hex" | "color"}.
+    Arrays are streamed item by item.
+    """
+    for index, item in enumerate(_iter_json_array(f), 1):
+        name = ""
+        try:
+            if not isinstance(item, dict):
+                raise ValueError("swatch is not an object")
+            name = str(item.get("name", ""))
+            if item.get("cmyk") is not None:
+                yield name, "CMYK", _parse_cmyk_string(tuple(float(v) for v in item["cmyk"]))
+            elif item.get("rgb") is not None:
+                yield name, "RGB", tuple(_clamp8(round(float(v))) for v in item["rgb"][:3])
+            elif item.get("hex") or item.get("color"):
+                yield (name, *_parse_any(str(item.get("hex") or item.get("color"))))
+            else:
+                raise ValueError("no color value")
+        except (ValueError, TypeError) as e:
+            errors.append((index, name, str(e)))
+
+def _read_gpl(f, errors: list):
+    """GIMP palette: a "GIMP Palette" header, optional Name:/Columns: lines, '#' comments, then "R G B<tab>name" lines."""
+    for line_number, line in enumerate(f, 1):
+        line = line.strip()
+        if not line or line.startswith("#") or line == "GIMP Palette" or line.split(":", 1)[0] in ("Name", "Columns"):
+            continue
+        parts = line.split(None, 3)
+        try:
+            rgb = _parse_rgb_string(" ".join(parts[:3]))
+        except ValueError as e:
+            errors.append((line_number, line, str(e)))
+            continue
+        yield (parts[3] if len(parts) > 3 else ""), "RGB", rgb
+
+_ASE_COLOR, _ASE_GROUP_START, _ASE_GROUP_END = 0x0001, 0xC001, 0xC002
+
+def _read_ase(f, errors: list):
+    """Adobe Swatch Exchange: RGB and CMYK entries are read, LAB/Gray entries are reported as errors."""
+    header = f.read(12)
+    if len(header) < 12 or header[:4] != b"ASEF":
+        raise ValueError("Not an Adobe Swatch Exchange file")
+    (count,) = struct.unpack(">I", header[8:12])
+    for index in range(1, count + 1):
+        head = f.read(6)
+        if len(head) < 6:
+            errors.append((index, "", "file ends early"))
+            return
+        block_type, length = struct.unpack(">HI", head)
+        body = f.read(length)
+        if block_type != _ASE_COLOR:
+            continue  # group start/end
+        (name_len,) = struct.unpack_from(">H", body, 0)
+        name = body[2:2 + name_len * 2].decode("utf-16-be").rstrip("\0")
+        offset = 2 + name_len * 2
+        model = body[offset:offset + 4].decode("ascii").strip()
+        offset += 4
+        if model == "RGB":
+            r, g, b = struct.unpack_from(">3f", body, offset)
+            yield name, "RGB", tuple(int(min(255, max(0, round(v * 255)))) for v in (r, g, b))
+        elif model == "CMYK":
+            yield name, "CMYK", _parse_cmyk_string(tuple(v * 100 for v in struct.unpack_from(">4f", body, offset)))
+        else:
+            errors.append((index, name, f"unsupported color model {model!r}"))
+
+_readers = {"csv": _read_csv, "json": _read_json, "gpl": _read_gpl, "ase": _read_ase}
+
+def read_palette(path, fmt: str | None = None, errors: list | None = None):
+    """
+    Stream the swatches of a palette file as (name, model, values) tuples,
+    with model "RGB" or "CMYK" and values as device 0..255 ints.
+    Entries that can't be read are appended to `errors` as (index_or_line, name_or_line, message).
+    """
+    fmt = _palette_format(path, fmt)
+    errors = [] if errors is None else errors
+    if fmt == "ase":
+        with open(path, "rb") as f:
+            yield from _read_ase(f, errors)
+    else:
+        with open(path, "r", encoding="utf-8-sig", newline="" if fmt == "csv" else None) as f:
+            yield from _readers[fmt](f, errors)
+
+
+# ---------- Writers (streaming) ----------
+
+def _pct(arr: np.ndarray) -> np.ndarray:
+    return np.rint(arr.astype(np.float32) * (100.0 / 255.0)).astype(np.int32)
+
+class PaletteWriter:
+    """
+    Writes converted swatches chunk by chunk: `write(names, model, values)` with values an
+    (N,3) RGB or (N,4) CMYK uint8 array. Use as a context manager or call `close()`.
+    CMYK is written as percentages (CSV/JSON) or 0..1 floats (ASE); GPL holds RGB only.
+    """
+    def __init__(self, path, fmt: str | None = None, title: str = ""):
+        self.path = Path(path)
+        self.fmt = _palette_format(path, fmt)
+        self.title = title or self.path.stem
+        self.count = 0
+        self._model = None
+        self._f = open(self.path, "wb" if self.fmt == "ase" else "w", encoding=None if self.fmt == "ase" else "utf-8",
+                       newline="" if self.fmt == "csv" else None)
+        if self.fmt == "ase":
+            self._f.write(b"ASEF" + struct.pack(">HHI", 1, 0, 0))  # block count is patched on close
+        elif self.fmt == "json":
+            self._f.write("[")
+        elif self.fmt == "gpl":
+            self._f.write(f"GIMP Palette\nName: {self.title}\nColumns: 0\n#\n")
+
+    def write(self, names, model: str, values: np.ndarray):
+        if self.fmt == "gpl" and model != "RGB":
+            raise ValueError("GIMP palettes hold RGB colors only; convert to RGB or pick another format")
+        if self._model is None:
+            self._model = model
+            if self.fmt == "csv":
+                self._csv = csv.writer(self._f)
+                self._csv.writerow(["name", "r", "g", "b", "hex"] if model == "RGB" else ["name", "c", "m", "y", "k"])
+        elif model != self._model and self.fmt == "csv":
+            raise ValueError("A CSV palette holds a single color model")
+        getattr(self, f"_write_{self.fmt}")(names, model, values)
+        self.count += len(names)
+
+    def _write_csv(self, names, model, values):
+        if model == "RGB":
+            self._csv.writerows(
+                (n, r, g, b, f"#{r:02X}{g:02X}{b:02X}") for n, (r, g, b) in zip(names, values.tolist())
+            )
+        else:
+            self._csv.writerows((n, *v) for n, v in zip(names, _pct(values).tolist()))
+
+    def _write_json(self, names, model, values):
+        out = io.StringIO()
+        key = "rgb" if model == "RGB" else "cmyk"
+        rows = values.tolist() if model == "RGB" else _pct(values).tolist()
+        for n, v in zip(names, rows):
+            entry = {"name": n, key: v}
+            if model == "RGB":
+                entry["hex"] = "#{:02X}{:02X}{:02X}".format(*v)
+            out.write(("\n  " if self.count == 0 and out.tell() == 0 else ",\n  ") + json.dumps(entry, ensure_ascii=False))
+        self._f.write(out.getvalue())
+
+    def _write_gpl(self, names, model, values):
+        self._f.writelines(f"{r:3d} {g:3d} {b:3d}\t{n}\n" for n, (r, g, b) in zip(names, values.tolist()))
+
+    def _write_ase(self, names, model, values):
+        tag = b"RGB " if model == "RGB" else b"CMYK"
+        floats = (values.astype(np.float32) / np.float32(255.0)).astype(">f4")
+        chunks = []
+        for n, v in zip(names, floats):
+            name = n.encode("utf-16-be") + b"\0\0"
+            body = struct.pack(">H", len(name) // 2) + name + tag + v.tobytes() + struct.pack(">H", 2)  # 2 = normal color
+            chunks.append(struct.pack(">HI", _ASE_COLOR, len(body)) + body)
+        self._f.write(b"".join(chunks))
+
+    def close(self):
+        if self._f.closed:
+            return
+        if self.fmt == "json":
+            self._f.write("\n]\n" if self.count else "]\n")
+        elif self.fmt == "ase":
+            self._f.seek(8)
+            self._f.write(struct.pack(">I", self.count))
+        self._f.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+        return False
+
+
+# ---------- Batch conversion ----------
+
+def _profile_label(profile: str) -> str:
+    return Path(profile).stem if profile.lower() not in ("srgb", "lab") else profile
+
+def convert_palette(
+    src,
+    dst,
+    *,
+    to: str = "cmyk",
+    cmyk_profiles: list | str | None = None,
+    rgb_profile: str | None = None,
+    intent: int = ImageCms.Intent.RELATIVE_COLORIMETRIC,
+    black_point_compensation: bool = True,
+    src_format: str | None = None,
+    dst_format: str | None = None,
+    chunk_size: int = 65536,
+) -> dict:
+    """
+    Convert every swatch of a palette file to RGB or CMYK and write the result out.
+    - Reads and writes CSV, JSON, GIMP .gpl and Adobe .ase (chosen by file extension or *_format).
+    - Swatches are streamed in chunks of `chunk_size`; each chunk is converted with one batch
+      transform call per profile, so memory stays bounded for libraries of any size.
+    - cmyk_profiles: one profile or a list. With several, `dst` must contain "{profile}" and one
+      file is written per profile, e.g. "swatches_{profile}.ase".
+    - to="cmyk": RGB swatches are separated through each CMYK profile; CMYK swatches are kept as they are.
+      to="rgb": CMYK swatches are rendered through each CMYK profile; RGB swatches are kept as they are.
+
+    Returns a dict with 'swatches' (count written per file), 'outputs' (paths) and
+    'errors' (list of (index_or_line, name_or_line, message) for swatches that couldn't be read).
+
+    Usage:
+        convert_palette("library.gpl", "library_{profile}.ase", cmyk_profiles=["USWebCoatedSWOP.icc", "CoatedFOGRA39.icc"])
+    """
+    to = to.upper()
+    if to not in ("RGB", "CMYK"):
+        raise ValueError(f"Unsupported target model: {to!r} (expected 'RGB' or 'CMYK')")
+    if cmyk_profiles is None or isinstance(cmyk_profiles, str):
+        cmyk_profiles = [cmyk_profiles]
+    profiles = [_resolve_profiles(p, rgb_profile) for p in cmyk_profiles]
+    if len(profiles) > 1 and "{profile}" not in str(dst):
+        raise ValueError('Converting with several profiles needs a "{profile}" placeholder in dst')
+    outputs = [Path(str(dst).format(profile=_profile_label(cmyk))) for cmyk, _ in profiles]
+
+    convert = rgb_to_cmyk_batch if to == "CMYK" else cmyk_to_rgb_batch
+    from_model = "RGB" if to == "CMYK" else "CMYK"
+    channels = len(to)
+    errors = []
+    swatches = iter(read_palette(src, src_format, errors))
+    writers = [PaletteWriter(path, dst_format) for path in outputs]
+    try:
+        while True:
+            chunk = list(islice(swatches, chunk_size))
+            if not chunk:
+                break
+            names = [name for name, _, _ in chunk]
+            needs = [i for i, (_, model, _) in enumerate(chunk) if model == from_model]
+            keep = [i for i, (_, model, _) in enumerate(chunk) if model != from_model]
+            src_arr = np.array([chunk[i][2] for i in needs], dtype=np.uint8).reshape(-1, len(from_model))
+            kept = np.array([chunk[i][2] for i in keep], dtype=np.uint8).reshape(-1, channels)
+            for (cmyk_profile, rgb), writer in zip(profiles, writers):
+                out = np.empty((len(chunk), channels), dtype=np.uint8)
+                if needs:
+                    out[needs] = convert(
+                        src_arr, cmyk_profile=cmyk_profile, rgb_profile=rgb,
+                        intent=intent, black_point_compensation=black_point_compensation,
+                    )
+                if keep:
+                    out[keep] = kept
+                writer.write(names, to, out)
+    finally:
+        for writer in writers:
+            writer.close()
+    return {
+        "swatches": writers[0].count if writers else 0,
+        "outputs": [str(p) for p in outputs],
+        "errors": errors,
+    }
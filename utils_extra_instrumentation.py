@@ -0,0 +1,187 @@
+import os
+import math
+import time
+import threading
+from collections import deque
+
+
+# ---------- Lightweight spans / counters / histograms ----------
+
+def nearest_rank_percentile(sorted_samples, p):
+    """Nearest-rank percentile `p` (0..100) of an already sorted, non-empty sequence."""
+    n = len(sorted_samples)
+    return sorted_samples[min(n - 1, max(0, math.ceil(p / 100 * n) - 1))]
+
+
+class Histogram:
+    """
+    Latency samples for one span name.
+    - count/total/min/max cover every observation since the last reset.
+    - Percentiles are computed from the most recent `window` samples, so a long-running
+      process reports current behaviour rather than its whole history.
+    """
+    __slots__ = ("count", "total", "min", "max", "samples")
+
+    def __init__(self, window: int = 4096):
+        self.count = 0
+        self.total = 0.0
+        self.min = float("inf")
+        self.max = 0.0
+        self.samples = deque(maxlen=window)
+
+    def add(self, seconds: float):
+        self.count += 1
+        self.total += seconds
+        if seconds < self.min:
+            self.min = seconds
+        if seconds > self.max:
+            self.max = seconds
+        self.samples.append(seconds)
+
+    def percentiles(self, ps=(50, 95, 99)) -> dict:
+        """Nearest-rank percentiles (in seconds) over the sample window."""
+        data = sorted(self.samples)
+        if not data:
+            return {f"p{p:g}": None for p in ps}
+        return {f"p{p:g}": nearest_rank_percentile(data, p) for p in ps}
+
+    def summary(self, ps=(50, 95, 99)) -> dict:
+        return {
+            "count": self.count,
+            "total": self.total,
+            "avg": self.total / self.count if self.count else None,
+            "min": self.min if self.count else None,
+            "max": self.max if self.count else None,
+            **self.percentiles(ps),
+        }
+
+
+class _NullSpan:
+    """Shared no-op span returned while instrumentation is disabled."""
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+_null_span = _NullSpan()
+
+
+class _Span:
+    __slots__ = ("_owner", "_name", "_start")
+
+    def __init__(self, owner, name):
+        self._owner = owner
+        self._name = name
+
+    def __enter__(self):
+        self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self._owner.observe(self._name, time.perf_counter() - self._start)
+        return False
+
+
+class Instrumentation:
+    """
+    Named spans and counters for the color pipeline.
+    - Disabled by default: `span()` hands back a shared no-op context manager and `count()`
+      returns after one attribute check, so instrumented hot paths stay at full speed.
+    - Enable with `instrumentation.enable()` or the VOIDS_COLOR_INSTRUMENT=1 environment variable,
+      then read per-stage percentiles from the live process with `snapshot()` / `report()`.
+
+    Usage:
+        with instrumentation.span("cmyk_to_rgb.apply"):
+            ...
+        instrumentation.count("cmyk_to_rgb.cache_hit")
+    """
+    def __init__(self, enabled: bool = False, window: int = 4096):
+        self.enabled = enabled
+        self.window = window
+        self._histograms = {}
+        self._counters = {}
+        self._lock = threading.Lock()
+
+    def enable(self, enabled: bool = True):
+        self.enabled = enabled
+
+    def disable(self):
+        self.enabled = False
+
+    def span(self, name: str):
+        """Context manager timing the enclosed block under `name`."""
+        if not self.enabled:
+            return _null_span
+        return _Span(self, name)
+
+    def observe(self, name: str, seconds: float):
+        """Record an externally measured duration under `name`."""
+        if not self.enabled:
+            return
+        with self._lock:
+            hist = self._histograms.get(name)
+            if hist is None:
+                hist = self._histograms[name] = Histogram(self.window)
+            hist.add(seconds)
+
+    def count(self, name: str, n: int = 1):
+        if not self.enabled:
+            return
+        with self._lock:
+            self._counters[name] = self._counters.get(name, 0) + n
+
+    def timed(self, name: str | None = None):
+        """Decorator form of `span()`; the span name defaults to the function's qualified name."""
+        def decorator(func):
+            span_name = name or func.__qualname__
+
+            def wrapper(*args, **kwargs):
+                if not self.enabled:
+                    return func(*args, **kwargs)
+                with _Span(self, span_name):
+                    return func(*args, **kwargs)
+
+            wrapper.__name__ = func.__name__
+            wrapper.__qualname__ = func.__qualname__
+            wrapper.__doc__ = func.__doc__
+            wrapper.__wrapped__ = func
+            return wrapper
+        return decorator
+
+    def percentiles(self, name: str, ps=(50, 95, 99)) -> dict:
+        with self._lock:
+            hist = self._histograms.get(name)
+            return hist.percentiles(ps) if hist else {f"p{p:g}": None for p in ps}
+
+    def snapshot(self, ps=(50, 95, 99)) -> dict:
+        """Copy of everything collected so far: {"spans": {name: summary}, "counters": {name: n}}."""
+        with self._lock:
+            return {
+                "spans": {name: hist.summary(ps) for name, hist in sorted(self._histograms.items())},
+                "counters": dict(sorted(self._counters.items())),
+            }
+
+    def reset(self):
+        with self._lock:
+            self._histograms.clear()
+            self._counters.clear()
+
+    def report(self, ps=(50, 95, 99)):
+        """Print a per-stage latency table (microseconds) and the counters."""
+        snap = self.snapshot(ps)
+        cols = [f"p{p:g}" for p in ps]
+        print(f"{'span':<32}{'count':>9}{'avg':>11}" + "".join(f"{c:>11}" for c in cols) + f"{'max':>11}")
+        for name, s in snap["spans"].items():
+            us = lambda v: f"{v * 1e6:>11.1f}" if v is not None else f"{'-':>11}"
+            print(f"{name:<32}{s['count']:>9}{us(s['avg'])}" + "".join(us(s[c]) for c in cols) + us(s["max"]))
+        for name, n in snap["counters"].items():
+            print(f"{name:<32}{n:>9}")
+
+
+instrumentation = Instrumentation(
+    enabled=os.environ.get("VOIDS_COLOR_INSTRUMENT", "").strip().lower() in ("1", "true", "yes")
+)